@@ -0,0 +1,320 @@
+"""
+Member selection and assignment for project staffing.
+
+Everything here works on sets of members: selecting a team reads and
+locks each role's picks in one ``LIMIT``ed query, and assigning it is one
+bulk insert into the ``TeamMember.projects`` through table plus one
+``UPDATE``, however many members are involved.
+
+Members are picked in rotation-queue order: ``rotation_seq`` first, then
+``rotation_rank`` and ``performance_score`` as tie-breakers. Deploying a
+team moves it to the back of the queue by giving it the next sequence
+number, so each pick is a walk of ``teammember_role_rotation_idx`` that
+stops after the quota, and everyone gets their turn however the ranks
+are set.
+"""
+import uuid
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, Exists, F, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .caching import bump_data_version_on_commit
+from .models import TeamMember
+
+ROTATION_ORDER = ('rotation_seq', 'rotation_rank', '-performance_score')
+
+# The member columns allocation plans and previews work from.
+Candidate = namedtuple(
+    'Candidate',
+    ['pk', 'name', 'role', 'experience_level', 'rotation_seq', 'rotation_rank', 'performance_score', 'status'],
+)
+
+POOL_CACHE_KEY = 'allocation:available-pool:v2'
+POOL_CACHE_TIMEOUT = 30
+PREVIEW_CACHE_KEY = 'allocation:preview:{}'
+PREVIEW_CACHE_TIMEOUT = 10 * 60
+
+
+def on_project(project):
+    """
+    ``EXISTS`` test for a member already being assigned to ``project``.
+
+    Negated, this is a correlated ``NOT EXISTS`` probe of the through
+    table's (teammember, project) unique index, which lets the planner
+    keep walking the rotation index for the top-N pick instead of
+    materialising the project's members first.
+    """
+    return Exists(
+        TeamMember.projects.through.objects.filter(
+            teammember_id=OuterRef('pk'),
+            project_id=project.pk,
+        )
+    )
+
+
+def ranked_candidates(project):
+    """Members not yet on ``project``, in rotation order."""
+    return TeamMember.objects.filter(~on_project(project)).order_by(*ROTATION_ORDER)
+
+
+def locked_picks(project, limit, exclude=(), **filters):
+    """
+    Lock and return the first ``limit`` available members matching
+    ``filters`` and not yet on ``project``, in rotation order.
+
+    Rows another allocation holds are skipped rather than waited on, so
+    parallel allocations never pick the same member and the ``LIMIT`` is
+    still filled from the rows behind them.
+    """
+    return (
+        ranked_candidates(project)
+        .select_for_update(skip_locked=True)
+        .filter(status="available", **filters)
+        .exclude(pk__in=exclude)[:limit]
+    )
+
+
+def as_candidates(queryset):
+    return [Candidate(*row) for row in queryset.values_list(*Candidate._fields)]
+
+
+def plan_team(pool, num_collectors, num_supervisors):
+    """
+    Split a ranked candidate pool into collector and supervisor picks.
+
+    Collectors are the best-ranked data collectors and supervisors the
+    best-ranked supervisors. When there are not enough supervisors, data
+    collectors with supervisor experience who were not picked as
+    collectors stand in. Returns two lists of member pks in rank order.
+    """
+    num_collectors, num_supervisors = max(num_collectors, 0), max(num_supervisors, 0)
+    collectors, supervisors, stand_ins = [], [], []
+    for candidate in pool:
+        if candidate.role == 'supervisor':
+            if len(supervisors) < num_supervisors:
+                supervisors.append(candidate.pk)
+        elif len(collectors) < num_collectors:
+            collectors.append(candidate.pk)
+        elif candidate.experience_level == 'supervisor':
+            stand_ins.append(candidate.pk)
+
+    supervisors.extend(stand_ins[:num_supervisors - len(supervisors)])
+    return collectors, supervisors
+
+
+def select_members(project, num_collectors, num_supervisors):
+    """
+    Pick collectors and supervisors for ``project`` in rotation order.
+
+    Each quota is read and locked in one ``LIMIT``ed query (see
+    ``locked_picks``), so only the rows picked are ever read, however
+    large the roster. When there are not enough supervisors, data
+    collectors with supervisor experience who were not picked as
+    collectors stand in, and when there are not enough available data
+    collectors, the shortfall is filled from data collectors who are not
+    available. Returns ``(collectors, supervisors)`` as ``TeamMember``
+    instances.
+
+    Must be called inside ``transaction.atomic()``.
+    """
+    if num_collectors <= 0 and num_supervisors <= 0:
+        return [], []
+
+    collectors = list(locked_picks(project, max(num_collectors, 0), role='data_collector'))
+    supervisors = list(locked_picks(project, max(num_supervisors, 0), role='supervisor'))
+
+    if len(supervisors) < num_supervisors:
+        supervisors.extend(locked_picks(
+            project, num_supervisors - len(supervisors),
+            exclude=[member.pk for member in collectors],
+            role='data_collector', experience_level='supervisor',
+        ))
+
+    if len(collectors) < num_collectors:
+        remaining_needed = num_collectors - len(collectors)
+        collectors.extend(
+            ranked_candidates(project)
+            .select_for_update(skip_locked=True)
+            .filter(role='data_collector')
+            .exclude(status="available")[:remaining_needed]
+        )
+
+    return collectors, supervisors
+
+
+def cached_available_pool():
+    """
+    Snapshot of every available member in rotation order.
+
+    Kept in the cache for ``POOL_CACHE_TIMEOUT`` seconds and dropped as
+    soon as an assignment commits, so repeated previews do not re-read
+    the roster.
+    """
+    pool = cache.get(POOL_CACHE_KEY)
+    if pool is None:
+        pool = as_candidates(TeamMember.objects.filter(status="available").order_by(*ROTATION_ORDER))
+        cache.set(POOL_CACHE_KEY, pool, POOL_CACHE_TIMEOUT)
+    return pool
+
+
+def invalidate_available_pool():
+    cache.delete(POOL_CACHE_KEY)
+
+
+def preview_members(project, num_collectors, num_supervisors):
+    """
+    Plan a team the way ``select_members`` would, without writing or
+    locking anything.
+
+    ``project`` may be ``None`` for a project that does not exist yet.
+    Works from ``cached_available_pool``; the database is only hit to
+    exclude an existing project's members and to look for collectors
+    who are not available when the pool falls short. Returns
+    ``(collectors, supervisors)`` as ``Candidate`` rows.
+    """
+    pool = cached_available_pool()
+    if project is not None:
+        on_project_ids = set(project.team_members.values_list('pk', flat=True))
+        pool = [candidate for candidate in pool if candidate.pk not in on_project_ids]
+
+    collector_ids, supervisor_ids = plan_team(pool, num_collectors, num_supervisors)
+    by_pk = {candidate.pk: candidate for candidate in pool}
+    collectors = [by_pk[pk] for pk in collector_ids]
+    supervisors = [by_pk[pk] for pk in supervisor_ids]
+
+    if len(collectors) < num_collectors:
+        others = TeamMember.objects.filter(role='data_collector').exclude(status="available")
+        if project is not None:
+            others = others.filter(~on_project(project))
+        remaining_needed = num_collectors - len(collectors)
+        collectors.extend(as_candidates(others.order_by(*ROTATION_ORDER)[:remaining_needed]))
+
+    return collectors, supervisors
+
+
+def store_preview(request_hash, collectors, supervisors):
+    """Remember a previewed team and return the token that confirms it."""
+    token = uuid.uuid4().hex
+    cache.set(PREVIEW_CACHE_KEY.format(token), {
+        'request_hash': request_hash,
+        'collectors': [(c.pk, c.status) for c in collectors],
+        'supervisors': [(s.pk, s.status) for s in supervisors],
+    }, PREVIEW_CACHE_TIMEOUT)
+    return token
+
+
+def load_preview(token):
+    return cache.get(PREVIEW_CACHE_KEY.format(token))
+
+
+def discard_preview(token):
+    cache.delete(PREVIEW_CACHE_KEY.format(token))
+
+
+def lock_previewed_members(project, preview):
+    """
+    Lock the members of a stored preview for assignment.
+
+    Returns ``(collectors, supervisors)``, or ``None`` when any of them
+    has been locked, assigned to ``project`` or changed status since the
+    preview was made. Must be called inside ``transaction.atomic()``.
+    """
+    expected = dict(preview['collectors'] + preview['supervisors'])
+    locked = (
+        TeamMember.objects.select_for_update(skip_locked=True)
+        .filter(~on_project(project), pk__in=list(expected))
+        .in_bulk()
+    )
+    if len(locked) != len(expected):
+        return None
+    if any(locked[pk].status != previous_status for pk, previous_status in expected.items()):
+        return None
+    return (
+        [locked[pk] for pk, _ in preview['collectors']],
+        [locked[pk] for pk, _ in preview['supervisors']],
+    )
+
+
+def assign_members(project, members):
+    """
+    Add ``members`` to ``project`` and mark them as deployed.
+
+    Inserts the through rows with one ``bulk_create`` and bumps
+    ``projects_count`` with one ``F()`` update, which also moves the
+    members to the back of the rotation queue (one indexed
+    ``Max(rotation_seq)`` read). The in-memory instances are updated to
+    match, so callers can report on them without re-reading.
+    """
+    if not members:
+        return
+
+    Assignment = TeamMember.projects.through
+    Assignment.objects.bulk_create([
+        Assignment(teammember_id=member.pk, project_id=project.pk)
+        for member in members
+    ])
+
+    now = timezone.now()
+    # Concurrent allocations may draw the same number; they then share a
+    # place in the queue, which is harmless.
+    next_seq = (TeamMember.objects.aggregate(seq=Max('rotation_seq'))['seq'] or 0) + 1
+    TeamMember.objects.filter(pk__in=[member.pk for member in members]).update(
+        projects_count=F('projects_count') + 1,
+        status="deployed",
+        rotation_seq=next_seq,
+        updated_at=now,
+    )
+
+    for member in members:
+        member.projects_count += 1
+        member.status = "deployed"
+        member.rotation_seq = next_seq
+        member.updated_at = now
+
+    transaction.on_commit(invalidate_available_pool)
+    bump_data_version_on_commit()
+
+
+def release_members(project):
+    """
+    Take every member off ``project`` ahead of deleting it.
+
+    Each member's ``projects_count`` becomes the number of projects they
+    keep, and members left without a project become available again, all
+    in one ``UPDATE``; the through rows are then removed with one
+    ``DELETE``. Returns the members as they were before the change, as
+    dicts in name order, and a mapping of member pk to the names of the
+    projects they keep. Must be called inside ``transaction.atomic()``.
+    """
+    Assignment = TeamMember.projects.through
+    members = list(
+        project.team_members.values('id', 'name', 've_code', 'role', 'status', 'projects_count')
+    )
+
+    other_assignments = Assignment.objects.filter(
+        teammember_id__in=Assignment.objects.filter(project_id=project.pk).values('teammember_id')
+    ).exclude(project_id=project.pk)
+    remaining_projects = {}
+    for member_id, project_name in other_assignments.order_by('-project__created_at').values_list(
+        'teammember_id', 'project__name'
+    ):
+        remaining_projects.setdefault(member_id, []).append(project_name)
+
+    kept = Assignment.objects.filter(teammember_id=OuterRef('pk')).exclude(project_id=project.pk)
+    TeamMember.objects.filter(on_project(project)).update(
+        projects_count=Coalesce(
+            Subquery(kept.values('teammember_id').annotate(n=Count('pk')).values('n')),
+            0,
+        ),
+        status=Case(When(Exists(kept), then=Value("deployed")), default=Value("available")),
+        updated_at=timezone.now(),
+    )
+    Assignment.objects.filter(project_id=project.pk).delete()
+
+    transaction.on_commit(invalidate_available_pool)
+    bump_data_version_on_commit()
+    return members, remaining_projects
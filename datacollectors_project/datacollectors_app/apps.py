@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DatacollectorsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'datacollectors_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
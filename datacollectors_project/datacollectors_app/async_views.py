@@ -0,0 +1,112 @@
+"""
+Async read endpoints for ASGI deployments.
+
+These mirror the team member list/detail and the project dashboard using
+Django's async ORM (``aiterator``, ``acount``, ``aget``), so a request
+waiting on the database does not hold a worker thread under uvicorn.
+Queries that do not depend on each other are started together with
+``asyncio.gather``. Note that Django still runs each ORM call in its
+one sync thread per request, so today the gain is the freed event loop
+rather than parallel queries; the fan-out is ready for native async
+database drivers.
+
+They are plain Django async views (DRF views are sync-only), so they
+answer with ``JsonResponse`` and share serializers and payload builders
+with their sync counterparts in ``views.py``.
+"""
+import asyncio
+
+from django.db.models import Avg, Count, Prefetch
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.utils import encoders
+
+from .models import Project, Ratings, TeamMember
+from .routers import read_only
+from .serializers import TeamMemberReadSerializer
+from .views import AssignProjectView
+
+CHUNK_SIZE = 2000
+
+
+async def collect(queryset):
+    return [obj async for obj in queryset.aiterator(chunk_size=CHUNK_SIZE)]
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=encoders.JSONEncoder)
+
+
+def team_member_queryset():
+    return TeamMember.objects.prefetch_related(
+        Prefetch('projects', Project.objects.only('id', 'name'))
+    )
+
+
+@require_GET
+@read_only
+async def team_member_list(request):
+    """
+    Async ``GET /api/teammembers/`` with the ``status`` and ``unassigned``
+    filters. The rows and the total count are fetched concurrently.
+    """
+    queryset = team_member_queryset()
+    status_param = request.GET.get('status')
+    if status_param:
+        queryset = queryset.filter(status=status_param)
+    if request.GET.get('unassigned') == 'true':
+        queryset = queryset.filter(projects__isnull=True)
+
+    members, count = await asyncio.gather(collect(queryset), queryset.acount())
+    return json_response({
+        "message": "Filtered team members retrieved successfully.",
+        "count": count,
+        "data": TeamMemberReadSerializer(members, many=True).data,
+    })
+
+
+@require_GET
+@read_only
+async def team_member_detail(request, pk):
+    try:
+        member = await team_member_queryset().aget(pk=pk)
+    except TeamMember.DoesNotExist:
+        return json_response({"message": "Team member not found."}, status=404)
+    return json_response({
+        "message": "Team member details retrieved.",
+        "data": TeamMemberReadSerializer(member).data,
+    })
+
+
+@require_GET
+@read_only
+async def project_dashboard(request):
+    """
+    Async project dashboard: the same ``active_projects`` payload as
+    ``AssignProjectView.get`` (``?status=`` filter, no pagination), plus
+    member counts by role and status and rating aggregates, all three
+    read concurrently.
+    """
+    projects = AssignProjectView.dashboard_queryset(request.GET.get('status'))
+    role_counts = TeamMember.objects.order_by().values('role', 'status').annotate(n=Count('pk'))
+    ratings = Ratings.objects.aaggregate(count=Count('rating'), average=Avg('rating'))
+
+    projects, role_counts, ratings = await asyncio.gather(
+        collect(projects), collect(role_counts), ratings
+    )
+
+    members_by_role = {}
+    for row in role_counts:
+        members_by_role.setdefault(row['role'], {})[row['status']] = row['n']
+    if ratings['average'] is not None:
+        ratings['average'] = round(ratings['average'], 2)
+
+    return json_response({
+        "active_projects": {
+            project.name: AssignProjectView.dashboard_entry(project) for project in projects
+        },
+        "summary": {
+            "members_by_role": members_by_role,
+            "ratings": ratings,
+        },
+    })
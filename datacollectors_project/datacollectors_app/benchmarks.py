@@ -0,0 +1,141 @@
+"""
+Endpoint benchmark suite.
+
+``run_suite`` drives every API endpoint through the Django test client
+against whatever data is in the database (see ``synthetic.generate``)
+and records, per case, the response status, the number of SQL queries
+and wall-clock timings over ``repeat`` runs. The response cache is
+cleared before every request so each run measures the uncached path.
+``compare`` lines up two reports, e.g. from two commits.
+"""
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Project, Ratings, TeamMember
+
+BENCHMARK_PROJECT = 'Benchmark Ratings'
+# Members each run of a case rates on ``BENCHMARK_PROJECT``.
+RATERS_PER_RUN = {'rating_create': 1, 'rating_bulk_100': 100}
+
+
+def cases(repeat=5, only=None):
+    """
+    ``(name, method, path, payload_factory)`` for every case. Payload
+    factories take the run number so writes never collide.
+
+    The members the rating cases need for ``repeat`` runs are taken up
+    front; raises ``CommandError`` if the database has too few.
+    """
+    member = TeamMember.objects.order_by('pk').values_list('pk', flat=True).first()
+    unrated = Project.objects.get_or_create(name=BENCHMARK_PROJECT)[0]
+    needed = repeat * sum(count for name, count in RATERS_PER_RUN.items() if not only or name in only)
+    rater_ids = list(
+        TeamMember.objects.exclude(ratings__project=unrated).order_by('pk').values_list('pk', flat=True)[:needed]
+    )
+    if len(rater_ids) < needed:
+        raise CommandError(
+            f"The rating cases need {needed} members without a rating on '{BENCHMARK_PROJECT}' "
+            f"for {repeat} runs, but there are only {len(rater_ids)}. Generate more members, "
+            f"lower --repeat or leave the rating cases out with --only."
+        )
+    raters = iter(rater_ids)
+    assigned = []
+
+    def assignment(run):
+        name = f'Benchmark Assignment {time.time_ns()}-{run}'
+        assigned.append(name)
+        return {
+            'projectName': name, 'name': 'Benchmark', 'startDate': '2025-01-01', 'endDate': '2025-03-01',
+            'status': 'active', 'numCollectors': 20, 'numSupervisors': 2,
+        }
+
+    def rating(run):
+        return {'team_member': next(raters), 'project': unrated.pk, 'rating': 1 + run % 5}
+
+    def deletion(run):
+        # Projects staffed by the assign_project case, or a fresh one if
+        # that case was skipped, with every member rated as real projects
+        # are at the end.
+        if assigned:
+            project = Project.objects.get(name=assigned.pop(0))
+        else:
+            project = Project.objects.create(name=f'Benchmark Delete {time.time_ns()}')
+        Ratings.objects.bulk_create(
+            [Ratings(team_member=member, project=project, rating=1 + i % 5)
+             for i, member in enumerate(project.team_members.all())],
+            ignore_conflicts=True,
+        )
+        return {'project_name': project.name}
+
+    def bulk_ratings(run):
+        return [
+            {'team_member': str(next(raters)), 'project': str(unrated.pk), 'rating': 1 + i % 5}
+            for i in range(100)
+        ]
+
+    return [
+        ('teammember_list_page', 'get', f"{reverse('teammember-list')}?page_size=100", None),
+        ('teammember_list_full', 'get', reverse('teammember-list'), None),
+        ('teammember_retrieve', 'get', reverse('teammember-detail', args=[member]), None),
+        ('dashboard_page', 'get', f"{reverse('assign_project')}?page_size=50", None),
+        ('project_list_page', 'get', f"{reverse('project-list')}?page_size=100", None),
+        ('rating_list_page', 'get', f"{reverse('rate')}?page_size=100", None),
+        ('rating_summary', 'get', f"{reverse('rate')}?summary=true", None),
+        ('assign_project', 'post', reverse('assign_project'), assignment),
+        ('delete_project', 'delete', reverse('assign_project'), deletion),
+        ('rating_create', 'post', reverse('rate'), rating),
+        ('rating_bulk_100', 'post', reverse('rate_bulk'), bulk_ratings),
+    ]
+
+
+def run_suite(repeat=5, only=None):
+    client = Client()
+    results = {}
+    for name, method, path, payload in cases(repeat, only):
+        if only and name not in only:
+            continue
+        timings, queries, statuses = [], [], set()
+        for run in range(repeat):
+            kwargs = {}
+            if payload is not None:
+                kwargs = {'data': payload(run), 'content_type': 'application/json'}
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = getattr(client, method)(path, **kwargs)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+        timings.sort()
+        results[name] = {
+            'method': method.upper(),
+            'path': path,
+            'status': sorted(statuses),
+            'runs': repeat,
+            'queries': max(queries),
+            'min_ms': round(timings[0], 2),
+            'median_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        }
+    return results
+
+
+def compare(baseline, current):
+    """Per-case ``(name, baseline median, current median, % change, query delta)``."""
+    rows = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        change = (result['median_ms'] - before['median_ms']) / before['median_ms'] * 100 if before['median_ms'] else 0
+        rows.append((name, before['median_ms'], result['median_ms'], change, result['queries'] - before['queries']))
+    return rows
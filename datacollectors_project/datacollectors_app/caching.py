@@ -0,0 +1,186 @@
+"""
+Versioned response cache for the read endpoints.
+
+Every write to ``TeamMember``, ``Project``, ``Ratings`` or the
+member-project assignments bumps a single data-version counter in the
+cache (see ``signals.py``; bulk writes that bypass model signals bump it
+explicitly). Cached response bodies and their ETags are keyed on that
+version, so a write invalidates them all at once without tracking which
+responses it touched.
+
+The cache alias is ``settings.RESPONSE_CACHE_ALIAS``: the local-memory
+default, or a Redis-compatible backend configured in ``CACHES``. A
+process-local backend holds a separate data version per worker, so a
+write seen by one worker would leave the others serving (and answering
+304s for) stale bodies; ``cached_response`` is therefore switched off on
+one unless ``DEBUG`` or ``RESPONSE_CACHE_ALLOW_LOCAL`` is set.
+
+``conditional_response`` needs no cache at all: it derives ETag and
+Last-Modified from the ``updated_at`` columns of the rows a view reads.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+from . import metrics
+from .routers import use_primary
+
+DATA_VERSION_KEY = 'datacollectors:data-version'
+RESPONSE_KEY = 'datacollectors:response:{version}:{path}'
+
+
+def response_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def response_cache_enabled():
+    """Whether every worker sees the same data version."""
+    if settings.DEBUG or getattr(settings, 'RESPONSE_CACHE_ALLOW_LOCAL', False):
+        return True
+    return not isinstance(response_cache(), (LocMemCache, DummyCache))
+
+
+def data_version():
+    cache = response_cache()
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        # Start from the clock rather than 1 so a counter lost to eviction
+        # or a restart never comes back to a version with stale entries.
+        cache.add(DATA_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    cache = response_cache()
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        data_version()
+
+
+def bump_data_version_on_commit(using=None):
+    """
+    Bump the data version once the current transaction commits (or
+    straight away outside one), so readers never cache pre-commit data
+    under the new version. Repeated calls in one transaction schedule a
+    single bump.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if any(func is bump_data_version for _, func, _ in connection.run_on_commit):
+        return
+    transaction.on_commit(bump_data_version, using=using)
+
+
+def cached_response(view_method):
+    """
+    Serve a read view's JSON body from the cache, keyed on the data
+    version and the full request path.
+
+    Responses carry an ETag derived from the same key, and a matching
+    ``If-None-Match`` gets a 304 without touching the view or the cached
+    body. Only plain 200 JSON responses are cached; streaming responses
+    and other renderers (e.g. the browsable API) pass straight through.
+    Cache misses are rendered from the primary even inside ``read_only``,
+    so a lagging replica is never cached under the new version. Without
+    a shared cache backend (see ``response_cache_enabled``) every request
+    goes straight to the view.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json' or not response_cache_enabled():
+            return view_method(self, request, *args, **kwargs)
+
+        version = data_version()
+        path = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+        etag = f'"{version}-{path[:16]}"'
+
+        if etag in request.headers.get('If-None-Match', ''):
+            metrics.observe_cache('not_modified')
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        cache = response_cache()
+        key = RESPONSE_KEY.format(version=version, path=path)
+        body = cache.get(key)
+        cache_status = 'HIT'
+        if body is None:
+            with use_primary():
+                response = view_method(self, request, *args, **kwargs)
+            if response.status_code != 200 or getattr(response, 'streaming', False):
+                return response
+            body = JSONRenderer().render(response.data)
+            cache.set(key, body, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+            cache_status = 'MISS'
+        metrics.observe_cache(cache_status.lower())
+
+        response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['X-Cache'] = cache_status
+        patch_vary_headers(response, ['Accept'])
+        return response
+    return wrapper
+
+
+def conditional_response(*fields):
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` from the rows the
+    view reads, before it serializes anything.
+
+    One aggregate query over the view's ``get_queryset()`` (narrowed to
+    ``pk`` for detail routes) returns the newest of ``fields`` and the
+    row count; the count catches deletions, which leave no timestamp
+    behind. ``fields`` defaults to ``updated_at`` and may follow
+    relations, e.g. ``projects__updated_at``.
+    """
+    fields = fields or ('updated_at',)
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            queryset = self.get_queryset()
+            if 'pk' in kwargs:
+                queryset = queryset.filter(pk=kwargs['pk'])
+            try:
+                stats = queryset.order_by().aggregate(
+                    count=Count('pk', distinct=True),
+                    **{f'newest_{i}': Max(field) for i, field in enumerate(fields)},
+                )
+            except (TypeError, ValueError, ValidationError):
+                return view_method(self, request, *args, **kwargs)
+            if 'pk' in kwargs and not stats['count']:
+                return view_method(self, request, *args, **kwargs)
+
+            timestamps = [stats[f'newest_{i}'] for i in range(len(fields))]
+            newest = max((ts for ts in timestamps if ts is not None), default=None)
+            last_modified = int(newest.timestamp()) if newest else None
+            path = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+            etag = quote_etag('{}-{}-{}'.format(
+                stats['count'], newest.timestamp() if newest else 0, path[:16]
+            ))
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                return response
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200 and not getattr(response, 'streaming', False):
+                response['ETag'] = etag
+                if last_modified is not None:
+                    response['Last-Modified'] = http_date(last_modified)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,151 @@
+"""
+Streaming exports of the member-project assignment table.
+
+Rows are read in keyset-paged chunks of ``CHUNK_SIZE`` and written out
+as they arrive, so neither the server nor the database driver ever holds
+the full result set in memory (``iterator()`` would not guarantee that:
+mysqlclient buffers whole result sets client-side). CSV is always
+available; Parquet needs the optional ``pyarrow`` package.
+"""
+import csv
+import io
+from itertools import islice
+
+from django.db.models import F, FilteredRelation, Q
+
+from .models import TeamMember
+
+CHUNK_SIZE = 2000
+
+# (column name, lookup on the through table)
+ASSIGNMENT_COLUMNS = [
+    ('project_id', 'project_id'),
+    ('project_name', 'project__name'),
+    ('project_status', 'project__status'),
+    ('start_date', 'project__start_date'),
+    ('end_date', 'project__end_date'),
+    ('team_member_id', 'teammember_id'),
+    ('ve_code', 'teammember__ve_code'),
+    ('name', 'teammember__name'),
+    ('role', 'teammember__role'),
+    ('experience_level', 'teammember__experience_level'),
+    ('member_status', 'teammember__status'),
+    ('rating', 'project_rating__rating'),
+    ('feedback', 'project_rating__feedback'),
+]
+
+
+def assignment_rows(project_status=None, date_from=None, date_to=None):
+    """
+    One tuple per member-project assignment, in ``ASSIGNMENT_COLUMNS``
+    order, with the member's rating for that project if there is one.
+
+    ``project_status`` is a list of statuses; ``date_from``/``date_to``
+    keep projects whose start-end range overlaps the given window, with a
+    missing date counting as open-ended (as ``ProjectViewSet`` does).
+
+    The rating comes from one ``LEFT JOIN`` on (member, project). Rows are
+    read ``CHUNK_SIZE`` at a time in assignment order, each chunk picking
+    up after the last id of the one before.
+    """
+    assignments = TeamMember.projects.through.objects.annotate(
+        project_rating=FilteredRelation(
+            'teammember__ratings',
+            condition=Q(teammember__ratings__project_id=F('project_id')),
+        ),
+    )
+    if project_status:
+        assignments = assignments.filter(project__status__in=project_status)
+    if date_from:
+        assignments = assignments.filter(
+            Q(project__end_date__isnull=True) | Q(project__end_date__gte=date_from)
+        )
+    if date_to:
+        assignments = assignments.filter(
+            Q(project__start_date__isnull=True) | Q(project__start_date__lte=date_to)
+        )
+
+    columns = ['pk', *(lookup for _, lookup in ASSIGNMENT_COLUMNS)]
+    last_pk = 0
+    while True:
+        chunk = list(assignments.filter(pk__gt=last_pk).order_by('pk').values_list(*columns)[:CHUNK_SIZE])
+        for row in chunk:
+            yield row[1:]
+        if len(chunk) < CHUNK_SIZE:
+            return
+        last_pk = chunk[-1][0]
+
+
+class Echo:
+    """File-like object whose ``write`` hands back what it is given."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for column, _ in ASSIGNMENT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class ParquetSink(io.RawIOBase):
+    """Write target for ``ParquetWriter`` that is drained after each row group."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    types = {
+        'project_id': pa.int64(), 'team_member_id': pa.int64(), 'rating': pa.int64(),
+        'start_date': pa.date32(), 'end_date': pa.date32(),
+    }
+    return pa.schema([(column, types.get(column, pa.string())) for column, _ in ASSIGNMENT_COLUMNS])
+
+
+def stream_parquet(rows):
+    """
+    Write one Parquet row group per ``CHUNK_SIZE`` rows and yield the
+    bytes produced so far after each one.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    sink = ParquetSink()
+    writer = pq.ParquetWriter(sink, schema)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            break
+        columns = zip(*chunk)
+        writer.write_table(pa.table(
+            {field.name: list(values) for field, values in zip(schema, columns)}, schema=schema
+        ))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from datacollectors_app.synthetic import generate
+
+
+class Command(BaseCommand):
+    help = "Fill the database with realistic synthetic members, projects, assignments and ratings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=50000)
+        parser.add_argument('--projects', type=int, default=2000)
+        parser.add_argument('--ratings', type=int, default=500000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = generate(
+                members=options['members'],
+                projects=options['projects'],
+                ratings=options['ratings'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+                log=lambda message: self.stdout.write(f"  {message}"),
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {counts['members']} members, {counts['projects']} projects, "
+            f"{counts['assignments']} assignments and {counts['ratings']} ratings "
+            f"(prefix {counts['prefix']})."
+        ))
@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from datacollectors_app.roster import DEFAULT_CHUNK_SIZE, FORMATS, InvalidRosterFile, guess_format, import_roster
+
+
+class Command(BaseCommand):
+    help = "Import team members from a CSV or XLSX roster, upserting on ve_code."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Roster file to import.")
+        parser.add_argument('--file-format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--report', help="Write the full JSON report to this path.")
+
+    def handle(self, *args, **options):
+        file_format = options['file_format'] or guess_format(options['path'])
+        try:
+            with open(options['path'], 'rb') as roster:
+                report = import_roster(roster, file_format, options['chunk_size'])
+        except (OSError, ImportError, InvalidRosterFile) as exc:
+            raise CommandError(str(exc))
+
+        if options['report']:
+            with open(options['report'], 'w') as report_file:
+                json.dump(report, report_file, indent=2)
+        for error in report['errors'][:20]:
+            self.stderr.write(f"Row {error['row']} ({error['ve_code']}): {error['errors']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} created, {report['updated']} updated, {report['failed']} failed."
+        ))
@@ -0,0 +1,62 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests/second and latency of one or more running servers, "
+        "e.g. the same path under the WSGI and ASGI entry points:\n"
+        "  gunicorn datacollectors_project.wsgi -w 4 -b :8000\n"
+        "  uvicorn datacollectors_project.asgi:application --workers 4 --port 8001\n"
+        "  manage.py loadtest wsgi=http://localhost:8000/api/assign-project/ "
+        "asgi=http://localhost:8001/api/async/assign-project/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='+', metavar='[label=]url')
+        parser.add_argument('--requests', type=int, default=500, help="Requests per target.")
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        rows = []
+        for target in options['targets']:
+            label, url = target, target
+            if not target.startswith(('http://', 'https://')):
+                label, _, url = target.partition('=')
+            rows.append((label, *self.run(url, options)))
+
+        self.stdout.write(f"{'target':<30} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for label, rate, p50, p95, errors in rows:
+            self.stdout.write(f"{label:<30} {rate:>9.1f} {p50:>8.1f} {p95:>8.1f} {errors:>7}")
+
+    def run(self, url, options):
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                with urlopen(url, timeout=options['timeout']) as response:
+                    response.read()
+                    ok = response.status < 400
+            except (URLError, OSError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        # One warm-up request so connection setup is not counted, and so a
+        # wrong URL fails fast.
+        if not fetch(None)[1]:
+            raise CommandError(f"{url} did not answer with a success status.")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            results = list(pool.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return len(results) / elapsed, statistics.median(latencies), p95, errors
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from datacollectors_app.models import TeamMember
+
+
+class Command(BaseCommand):
+    help = "Recompute every team member's stored rating count, sum and average from Ratings."
+
+    def handle(self, *args, **options):
+        updated = TeamMember.objects.all().refresh_rating_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating stats for {updated} team members."))
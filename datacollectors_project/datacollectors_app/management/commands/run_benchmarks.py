@@ -0,0 +1,84 @@
+import json
+import platform
+import subprocess
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from datacollectors_app.benchmarks import compare, run_suite
+from datacollectors_app.synthetic import generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic data in a throwaway test database, time and query-count every "
+        "endpoint on it and write a JSON report. Run with "
+        "--settings=datacollectors_project.benchmark_settings to use SQLite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=50000)
+        parser.add_argument('--projects', type=int, default=2000)
+        parser.add_argument('--ratings', type=int, default=500000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--only', nargs='+', metavar='CASE', help="Run only these cases.")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+        parser.add_argument('--compare', metavar='REPORT', help="Print changes against an earlier report.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            scale = generate(
+                members=options['members'],
+                projects=options['projects'],
+                ratings=options['ratings'],
+                seed=options['seed'],
+                log=lambda message: self.stderr.write(f"  generated {message}"),
+            )
+            results = run_suite(options['repeat'], options['only'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'commit': self.git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'scale': scale,
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output)
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            self.stderr.write(f"{'case':<24} {'before ms':>10} {'after ms':>10} {'change':>8} {'queries':>8}")
+            for name, before, after, change, queries in compare(baseline['results'], results):
+                self.stderr.write(f"{name:<24} {before:>10.2f} {after:>10.2f} {change:>+7.1f}% {queries:>+8d}")
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
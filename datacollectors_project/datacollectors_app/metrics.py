@@ -0,0 +1,119 @@
+"""
+Prometheus metrics for the API and the allocation path.
+
+Request latency and query counts are recorded by
+``RequestInstrumentationMiddleware``, response-cache outcomes by
+``caching.cached_response`` and allocation sizes by
+``AssignProjectView.post``; ``metrics_view`` serves them at ``/metrics``
+together with member counts by status and role, read with one
+``GROUP BY`` per scrape.
+
+``prometheus_client`` is optional: without it the recording helpers do
+nothing and ``/metrics`` answers 503. With several worker processes, set
+``PROMETHEUS_MULTIPROC_DIR`` to a shared, emptied-on-start directory and
+every worker's samples are aggregated at scrape time.
+"""
+import os
+
+from django.db.models import Count
+from django.http import HttpResponse
+
+from .models import TeamMember
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Histogram
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        'datacollectors_request_duration_seconds', "Request latency by view.",
+        ['view', 'method', 'status'],
+    )
+    REQUEST_QUERIES = Histogram(
+        'datacollectors_request_queries', "SQL queries per request by view.",
+        ['view'], buckets=SIZE_BUCKETS,
+    )
+    RESPONSE_CACHE = Counter(
+        'datacollectors_response_cache_requests', "Versioned response cache lookups by result.",
+        ['result'],
+    )
+    ALLOCATION_SELECTED = Histogram(
+        'datacollectors_allocation_members_selected', "Members assigned per allocation by role.",
+        ['role'], buckets=SIZE_BUCKETS,
+    )
+    ALLOCATION_SHORTFALL = Histogram(
+        'datacollectors_allocation_shortfall', "Members requested but not assigned per allocation by role.",
+        ['role'], buckets=SIZE_BUCKETS,
+    )
+
+
+def observe_request(view, method, status, seconds, queries):
+    if prometheus_client is None:
+        return
+    REQUEST_LATENCY.labels(view, method, status).observe(seconds)
+    REQUEST_QUERIES.labels(view).observe(queries)
+
+
+def observe_cache(result):
+    if prometheus_client is not None:
+        RESPONSE_CACHE.labels(result).inc()
+
+
+def observe_allocation(collectors_needed, collectors, supervisors_needed, supervisors):
+    if prometheus_client is None:
+        return
+    for role, needed, selected in (
+        ('data_collector', collectors_needed, collectors),
+        ('supervisor', supervisors_needed, supervisors),
+    ):
+        ALLOCATION_SELECTED.labels(role).observe(selected)
+        ALLOCATION_SHORTFALL.labels(role).observe(max(needed - selected, 0))
+
+
+class MemberPoolCollector:
+    """Team members by status and role, counted at scrape time."""
+
+    def describe(self):
+        yield self.family()
+
+    def collect(self):
+        family = self.family()
+        for row in TeamMember.objects.order_by().values('status', 'role').annotate(n=Count('pk')):
+            family.add_metric([row['status'], row['role']], row['n'])
+        yield family
+
+    def family(self):
+        return GaugeMetricFamily(
+            'datacollectors_members', "Team members by status and role.", labels=['status', 'role']
+        )
+
+
+def registry():
+    """The registry to expose: this process's, or every worker's in multiprocess mode."""
+    scrape = CollectorRegistry()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.MultiProcessCollector(scrape)
+    else:
+        scrape.register(_ProcessRegistry())
+    scrape.register(MemberPoolCollector())
+    return scrape
+
+
+class _ProcessRegistry:
+    def collect(self):
+        return prometheus_client.REGISTRY.collect()
+
+
+def metrics_view(request):
+    if prometheus_client is None:
+        return HttpResponse("prometheus_client is not installed.", status=503, content_type='text/plain')
+    return HttpResponse(
+        prometheus_client.generate_latest(registry()),
+        content_type=prometheus_client.CONTENT_TYPE_LATEST,
+    )
@@ -0,0 +1,142 @@
+"""
+Per-request SQL and latency instrumentation.
+
+``RequestInstrumentationMiddleware`` hooks every database connection with
+``connection.execute_wrapper`` for the length of a request, so it works
+with ``DEBUG=False``. It reports the query count and database time in a
+``Server-Timing`` header and logs one JSON line per slow request and per
+request that repeats the same ``SELECT`` (the N+1 pattern), to the
+``datacollectors.instrumentation`` logger. It runs in sync and async
+mode, so it does not push ASGI requests onto a thread of their own.
+
+Thresholds come from ``settings.SLOW_REQUEST_MS`` and
+``settings.DUPLICATE_QUERY_THRESHOLD``. Latency and query counts also
+go to the Prometheus histograms in ``metrics``. Time spent streaming a
+``StreamingHttpResponse`` body happens after the middleware returns and
+is not counted.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger('datacollectors.instrumentation')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def sql_signature(sql):
+    """``sql`` with literals and parameter lists folded, for grouping."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _LIST.sub('(...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """``execute_wrapper`` hook counting queries, their time and SELECT signatures."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.selects = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            if sql.lstrip()[:6].upper() == 'SELECT':
+                self.selects[sql_signature(sql)] += 1
+
+    def duplicates(self, threshold):
+        return [(sql, n) for sql, n in self.selects.most_common() if n >= threshold]
+
+
+def hook_connections(recorder):
+    """Install ``recorder`` on this thread's connections; close the returned stack to remove it."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+    return stack
+
+
+class RequestInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        self.duplicate_threshold = getattr(settings, 'DUPLICATE_QUERY_THRESHOLD', 5)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        request.query_recorder = recorder
+        started = time.perf_counter()
+        with hook_connections(recorder):
+            response = self.get_response(request)
+        return self.report(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        request.query_recorder = recorder
+        started = time.perf_counter()
+        # Connections are per thread, and an async request's ORM calls run
+        # in its sync thread, so the hooks are installed there.
+        stack = await sync_to_async(hook_connections)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.report(request, response, recorder, started)
+
+    def report(self, request, response, recorder, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.duration * 1000
+
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+            f'app;dur={total_ms - db_ms:.1f}, total;dur={total_ms:.1f}'
+        )
+
+        view = getattr(request.resolver_match, 'view_name', None) or 'unmatched'
+        metrics.observe_request(view, request.method, response.status_code, total_ms / 1000, recorder.count)
+
+        line = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(total_ms, 1),
+            "db_ms": round(db_ms, 1),
+            "queries": recorder.count,
+        }
+        duplicates = recorder.duplicates(self.duplicate_threshold)
+        if duplicates:
+            logger.warning(json.dumps({
+                "event": "duplicate_queries",
+                **line,
+                "duplicates": [{"sql": sql, "count": n} for sql, n in duplicates[:5]],
+            }))
+        if total_ms >= self.slow_ms:
+            logger.warning(json.dumps({"event": "slow_request", **line}))
+        return response
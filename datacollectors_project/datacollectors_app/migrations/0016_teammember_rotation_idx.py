@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datacollectors_app', '0015_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(fields=['status', 'rotation_rank', '-performance_score'], name='teammember_rotation_idx'),
+        ),
+    ]
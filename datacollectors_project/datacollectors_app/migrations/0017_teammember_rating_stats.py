@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:49
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Round
+
+
+def backfill_rating_stats(apps, schema_editor):
+    TeamMember = apps.get_model('datacollectors_app', 'TeamMember')
+    Ratings = apps.get_model('datacollectors_app', 'Ratings')
+    rated = Ratings.objects.filter(
+        team_member=OuterRef('pk'), rating__isnull=False
+    ).values('team_member')
+    TeamMember.objects.update(
+        rating_count=Coalesce(Subquery(rated.annotate(n=Count('pk')).values('n')), 0),
+        rating_sum=Coalesce(Subquery(rated.annotate(total=Sum('rating')).values('total')), 0),
+        average_rating=Subquery(rated.annotate(avg=Round(Avg('rating'), 2)).values('avg')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datacollectors_app', '0016_teammember_rotation_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teammember',
+            name='average_rating',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='teammember',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teammember',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datacollectors_app', '0017_teammember_rating_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['updated_at'], name='project_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ratings',
+            index=models.Index(fields=['updated_at'], name='datacollect_updated_328c64_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(fields=['updated_at'], name='teammember_updated_idx'),
+        ),
+    ]
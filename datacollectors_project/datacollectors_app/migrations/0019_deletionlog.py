@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datacollectors_app', '0018_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text="Model name, e.g. 'teammember'", max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Deletion Log',
+                'verbose_name_plural': 'Deletion Log',
+                'indexes': [models.Index(fields=['deleted_at'], name='deletionlog_deleted_idx')],
+            },
+        ),
+    ]
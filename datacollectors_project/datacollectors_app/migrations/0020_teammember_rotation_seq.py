@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:01
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_rotation_seq(apps, schema_editor):
+    # Members already on more projects start further back in the queue.
+    TeamMember = apps.get_model('datacollectors_app', 'TeamMember')
+    TeamMember.objects.update(rotation_seq=F('projects_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datacollectors_app', '0019_deletionlog'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='teammember',
+            name='teammember_rotation_idx',
+        ),
+        migrations.AddField(
+            model_name='teammember',
+            name='rotation_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(seed_rotation_seq, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(fields=['status', 'rotation_seq', 'rotation_rank', '-performance_score'], name='teammember_rotation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(fields=['rotation_seq'], name='teammember_rotation_seq_idx'),
+        ),
+    ]
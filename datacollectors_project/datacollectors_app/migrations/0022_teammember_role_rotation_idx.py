@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datacollectors_app', '0021_project_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(fields=['status', 'role', 'rotation_seq', 'rotation_rank', '-performance_score'], name='teammember_role_rotation_idx'),
+        ),
+    ]
@@ -1,8 +1,33 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Prefetch, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Round
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+class ProjectQuerySet(models.QuerySet):
+    def with_staffing(self):
+        """
+        Annotate each project with its assigned member counts, in total
+        and per role, and whether it is fully staffed, in this query
+        rather than one query per project.
+        """
+        return self.annotate(
+            members_assigned=Count('team_members'),
+            collectors_assigned=Count('team_members', filter=Q(team_members__role='data_collector')),
+            supervisors_assigned=Count('team_members', filter=Q(team_members__role='supervisor')),
+        ).annotate(
+            fully_staffed=Case(
+                When(
+                    members_assigned__gte=F('num_collectors_needed') + F('num_supervisors_needed'),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+        )
+
+
 class Project(models.Model):
     STATUS_CHOICES = [
         ('active', 'Active'),
@@ -29,6 +54,8 @@ class Project(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProjectQuerySet.as_manager()
+
     def __str__(self):
         return self.name
     
@@ -54,16 +81,63 @@ class Project(models.Model):
     
     @property
     def assigned_members_count(self):
+        """Read from ``with_staffing()`` when annotated, else counted"""
+        if 'members_assigned' in self.__dict__:
+            return self.members_assigned
         return self.team_members.count()
     
     @property
     def is_fully_staffed(self):
+        if 'fully_staffed' in self.__dict__:
+            return self.fully_staffed
         return self.assigned_members_count >= self.total_members_needed
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Project"
         verbose_name_plural = "Projects"
+        indexes = [
+            # Keeps the conditional-GET Max(updated_at) check an index lookup.
+            models.Index(fields=['updated_at'], name='project_updated_idx'),
+            # Project listing: status filter walked in created_at order.
+            models.Index(fields=['status', '-created_at'], name='project_status_created_idx'),
+            models.Index(fields=['-created_at'], name='project_created_idx'),
+            # Date-window overlap filters.
+            models.Index(fields=['start_date', 'end_date'], name='project_dates_idx'),
+            models.Index(fields=['end_date'], name='project_end_date_idx'),
+        ]
+
+
+class TeamMemberQuerySet(models.QuerySet):
+    def with_assignment_stats(self):
+        """
+        Prefetch each member's projects and annotate how many they are on
+        (``projects_assigned``) and how many of those are active
+        (``active_projects_assigned``), for listings that read
+        ``assigned_projects`` or ``current_project_count``.
+        """
+        return self.annotate(
+            projects_assigned=Count('projects'),
+            active_projects_assigned=Count('projects', filter=Q(projects__status='active')),
+        ).prefetch_related(
+            Prefetch('projects', Project.objects.only('id', 'name'))
+        )
+
+    def refresh_rating_stats(self):
+        """
+        Recompute the stored rating aggregates of these members from
+        their ``Ratings`` rows, in one ``UPDATE``. Moves ``updated_at``,
+        so conditional GETs and sync clients see the new aggregates.
+        """
+        rated = Ratings.objects.filter(
+            team_member=OuterRef('pk'), rating__isnull=False
+        ).values('team_member')
+        return self.update(
+            rating_count=Coalesce(Subquery(rated.annotate(n=models.Count('pk')).values('n')), 0),
+            rating_sum=Coalesce(Subquery(rated.annotate(total=models.Sum('rating')).values('total')), 0),
+            average_rating=Subquery(rated.annotate(avg=Round(models.Avg('rating'), 2)).values('avg')),
+            updated_at=timezone.now(),
+        )
 
 
 class TeamMember(models.Model):
@@ -103,6 +177,16 @@ class TeamMember(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(100)]
     )
     rotation_rank = models.PositiveIntegerField(default=1)
+    # Rotation queue position: every deployment moves the member behind
+    # everyone else (see allocation.assign_members). rotation_rank only
+    # orders members within the same position.
+    rotation_seq = models.PositiveBigIntegerField(default=0)
+
+    # Rating aggregates, kept in step with Ratings by the receivers in
+    # signals.py (see TeamMemberQuerySet.refresh_rating_stats)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(null=True, blank=True)
     
     # Status and relationships
     status = models.CharField(
@@ -121,31 +205,64 @@ class TeamMember(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TeamMemberQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.ve_code})"
     
     @property
     def assigned_projects(self):
         """Get list of project names this member is assigned to"""
+        if 'projects' in getattr(self, '_prefetched_objects_cache', {}):
+            return [project.name for project in self.projects.all()]
         return list(self.projects.values_list('name', flat=True))
     
     @property
     def current_project_count(self):
         """Count of currently assigned projects"""
+        if 'active_projects_assigned' in self.__dict__:
+            return self.active_projects_assigned
         return self.projects.filter(status='active').count()
     
-    @property
-    def average_rating(self):
-        """Calculate average rating across all projects"""
-        ratings = self.ratings_set.filter(rating__isnull=False)
-        if ratings.exists():
-            return round(ratings.aggregate(avg=models.Avg('rating'))['avg'], 2)
-        return None
-
     class Meta:
         ordering = ['name']
         verbose_name = "Team Member"
         verbose_name_plural = "Team Members"
+        indexes = [
+            # Serves the allocation pick for each role: filter on status
+            # and role, then walk the rotation order without a sort and
+            # stop at the quota.
+            models.Index(
+                fields=['status', 'role', 'rotation_seq', 'rotation_rank', '-performance_score'],
+                name='teammember_role_rotation_idx'
+            ),
+            # Same walk across roles, for the preview pool snapshot.
+            models.Index(
+                fields=['status', 'rotation_seq', 'rotation_rank', '-performance_score'],
+                name='teammember_rotation_idx'
+            ),
+            # Serves the Max(rotation_seq) read when a team is deployed.
+            models.Index(fields=['rotation_seq'], name='teammember_rotation_seq_idx'),
+            models.Index(fields=['updated_at'], name='teammember_updated_idx'),
+        ]
+
+
+class RatingsQuerySet(models.QuerySet):
+    def delete_in_bulk(self):
+        """
+        Delete these ratings with one ``DELETE`` rather than one per 100
+        rows, writing their tombstones in one insert and refreshing their
+        members' aggregates in one ``UPDATE``. Sends no model signals,
+        so callers bump the data version (deleting the parent row does).
+        """
+        member_ids = set(self.values_list('team_member_id', flat=True))
+        if not member_ids:
+            return 0
+        with transaction.atomic(using=self.db):
+            DeletionLog.objects.using(self.db).record_rows(self)
+            deleted = self._raw_delete(self.db)
+            TeamMember.objects.using(self.db).filter(pk__in=member_ids).refresh_rating_stats()
+        return deleted
 
 
 class Ratings(models.Model):
@@ -179,6 +296,8 @@ class Ratings(models.Model):
         blank=True,
         help_text="Who provided this rating"
     )
+
+    objects = RatingsQuerySet.as_manager()
     
     class Meta:
         unique_together = ('team_member', 'project')
@@ -189,6 +308,7 @@ class Ratings(models.Model):
             models.Index(fields=['team_member', 'project']),
             models.Index(fields=['rating']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
@@ -201,6 +321,90 @@ class Ratings(models.Model):
         if self.rating is not None and (self.rating < 1 or self.rating > 5):
             raise ValidationError("Rating must be between 1 and 5")
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember who the rating belonged to when loaded, so moving it to
+        # another member refreshes both members' aggregates.
+        instance._loaded_team_member_id = instance.__dict__.get('team_member_id')
+        return instance
+
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        # The post_save receiver refreshes the member's rating aggregates;
+        # keep that in the same transaction as the row itself.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+
+class IdempotencyKey(models.Model):
+    """Response recorded for a request sent with an ``Idempotency-Key`` header"""
+    key = models.CharField(max_length=255, unique=True)
+    request_hash = models.CharField(
+        max_length=64,
+        help_text="SHA-256 of the request body the key was first used with"
+    )
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+
+
+class DeletionLogQuerySet(models.QuerySet):
+    def record(self, model, ids):
+        """Write one tombstone per deleted ``model`` row in ``ids``."""
+        return self.bulk_create([
+            self.model(model=model._meta.model_name, object_id=pk) for pk in ids
+        ])
+
+    def record_rows(self, queryset):
+        """
+        Write one tombstone per row of ``queryset``, about to be deleted,
+        with a single ``INSERT ... SELECT`` however many rows it matches.
+        """
+        connection = connections[self.db]
+        select, params = (
+            queryset.order_by().annotate(tombstone_id=F('pk')).values('tombstone_id')
+            .query.sql_with_params()
+        )
+        deleted_at = self.model._meta.get_field('deleted_at').get_db_prep_value(timezone.now(), connection)
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {table} ({model}, {object_id}, {deleted_at}) '
+                'SELECT %s, deleted_rows.{pk}, %s FROM ({select}) deleted_rows'.format(
+                    table=quote(self.model._meta.db_table),
+                    model=quote('model'),
+                    object_id=quote('object_id'),
+                    deleted_at=quote('deleted_at'),
+                    pk=quote('tombstone_id'),
+                    select=select,
+                ),
+                (queryset.model._meta.model_name, deleted_at, *params),
+            )
+
+
+class DeletionLog(models.Model):
+    """Tombstone for a deleted row, read by the sync endpoint"""
+    model = models.CharField(max_length=50, help_text="Model name, e.g. 'teammember'")
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = DeletionLogQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
+
+    class Meta:
+        verbose_name = "Deletion Log"
+        verbose_name_plural = "Deletion Log"
+        indexes = [
+            models.Index(fields=['deleted_at'], name='deletionlog_deleted_idx'),
+        ]
@@ -0,0 +1,46 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    """
+    Cursor pagination that only kicks in when the client asks for it.
+
+    Existing clients expect the full collection in one response, so a
+    request is paginated only when it carries a ``cursor`` or
+    ``page_size`` query parameter.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class TeamMemberCursorPagination(OptInCursorPagination):
+    # Matches TeamMember.Meta.ordering, with id to break ties between
+    # members sharing a name.
+    ordering = ('name', 'id')
+
+
+class ProjectCursorPagination(OptInCursorPagination):
+    # Newest projects first, as in Project.Meta.ordering.
+    ordering = '-created_at'
+
+
+class RatingCursorPagination(OptInCursorPagination):
+    # Keyset on created_at, served by the Ratings created_at index.
+    ordering = '-created_at'
+
+
+class ProjectListPagination(CursorPagination):
+    # Always on: the project resource has no unpaginated legacy clients.
+    # Keyset on created_at, served by project_created_idx (or
+    # project_status_created_idx when filtered by status).
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = '-created_at'
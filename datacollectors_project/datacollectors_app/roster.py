@@ -0,0 +1,162 @@
+"""
+Bulk roster import: stream-parse a CSV or XLSX file of team members and
+upsert them on ``ve_code`` one chunk at a time.
+
+Only one chunk of rows is held in memory at once, so a 100k-row file
+costs the same peak memory as a 1k-row one. Reading XLSX files needs the
+optional ``openpyxl`` package.
+"""
+import codecs
+import csv
+from itertools import islice
+from zipfile import BadZipFile
+
+from django.db import connection, transaction
+
+from .caching import bump_data_version_on_commit
+from .models import TeamMember
+from .serializers import TeamMemberImportSerializer
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ('csv', 'xlsx')
+
+
+class InvalidRosterFile(ValueError):
+    """The uploaded file cannot be read in the format it was imported as."""
+
+
+def guess_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in FORMATS else 'csv'
+
+
+def normalise_header(header):
+    return [str(column or '').strip().lower().replace(' ', '_') for column in header]
+
+
+def iter_csv_rows(file):
+    reader = csv.reader(codecs.iterdecode(file, 'utf-8-sig'))
+    try:
+        header = normalise_header(next(reader, []))
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield dict(zip(header, values))
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise InvalidRosterFile(f"Line {reader.line_num + 1} is not valid UTF-8 CSV: {exc}")
+
+
+def iter_xlsx_rows(file):
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ImportError("Importing XLSX rosters requires the 'openpyxl' package.")
+
+    # read_only mode streams rows instead of loading the whole sheet.
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException, KeyError) as exc:
+        raise InvalidRosterFile(f"Not a valid XLSX workbook: {exc}")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = normalise_header(next(rows, []))
+        for values in rows:
+            if any(value not in (None, '') for value in values):
+                yield {
+                    column: '' if value is None else str(value)
+                    for column, value in zip(header, values)
+                }
+    finally:
+        workbook.close()
+
+
+def iter_rows(file, file_format):
+    if file_format == 'xlsx':
+        return iter_xlsx_rows(file)
+    return iter_csv_rows(file)
+
+
+def import_roster(file, file_format='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Upsert every row of a roster file on ``ve_code``.
+
+    Each chunk is validated in memory with ``TeamMemberImportSerializer``,
+    checked against existing members with one query and written with one
+    ``bulk_create(update_conflicts=True)`` per set of filled-in columns,
+    in its own transaction. Existing members only have the cells that
+    are filled in overwritten; blank cells keep their current value, and
+    new members get the field's default for them. ``status`` and
+    ``projects_count`` belong to allocation and are never imported.
+    Returns a report with created/updated/failed counts and the errors of
+    failed rows (numbered from 2, the first line after the header).
+
+    Raises ``InvalidRosterFile`` if the file cannot be parsed; chunks
+    before the unreadable part stay imported.
+    """
+    report = {"created": 0, "updated": 0, "failed": 0, "errors": []}
+    rows = enumerate(iter_rows(file, file_format), start=2)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        import_chunk(chunk, report)
+
+    report["errors_truncated"] = report["failed"] > len(report["errors"])
+    return report
+
+
+def import_chunk(chunk, report):
+    importable = set(TeamMemberImportSerializer.Meta.fields)
+    # Blank cells are left out, so they fall back to the field's default
+    # on create and are not written on update.
+    rows = [
+        (line, {
+            key: value.strip() for key, value in row.items()
+            if key in importable and value and value.strip()
+        })
+        for line, row in chunk
+    ]
+    existing = set(
+        TeamMember.objects.filter(
+            ve_code__in=[data['ve_code'] for _, data in rows if 've_code' in data]
+        ).values_list('ve_code', flat=True)
+    )
+
+    members = {}
+    columns_by_code = {}
+    for line, data in rows:
+        # Updates only need the cells they change.
+        serializer = TeamMemberImportSerializer(data=data, partial=data.get('ve_code') in existing)
+        errors = dict(serializer.errors) if not serializer.is_valid() else {}
+        ve_code = serializer.validated_data['ve_code'] if not errors else data.get('ve_code')
+        if not errors and ve_code in members:
+            errors = {"ve_code": ["Duplicate ve_code in this file."]}
+        if errors:
+            report["failed"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"row": line, "ve_code": ve_code, "errors": errors})
+            continue
+        members[ve_code] = TeamMember(**serializer.validated_data)
+        columns_by_code[ve_code] = frozenset(data) - {'ve_code'}
+
+    if not members:
+        return
+
+    # Rows filled in the same columns are upserted together, so each
+    # batch only overwrites the columns its rows actually have values for.
+    batches = {}
+    for ve_code, member in members.items():
+        batches.setdefault(columns_by_code[ve_code], []).append(member)
+
+    with transaction.atomic():
+        for columns, batch in batches.items():
+            upsert = {'update_conflicts': True, 'update_fields': sorted(columns) + ['updated_at']}
+            if connection.features.supports_update_conflicts_with_target:
+                upsert['unique_fields'] = ['ve_code']
+            TeamMember.objects.bulk_create(batch, **upsert)
+        bump_data_version_on_commit()
+
+    updated = len(existing.intersection(members))
+    report["updated"] += updated
+    report["created"] += len(members) - updated
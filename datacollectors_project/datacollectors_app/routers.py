@@ -0,0 +1,97 @@
+"""
+Read-replica routing.
+
+Views that only read wrap themselves in ``read_only``; while one runs,
+``ReadReplicaRouter`` sends its reads to ``settings.DATABASE_REPLICA_ALIAS``.
+Everything else, including allocation and deletion and any read made
+outside a marked view, stays on the primary, so locking reads and
+read-your-writes inside a transaction are unaffected.
+
+Two cases need more than the decorator. A streamed body is consumed
+after the view has returned, so its generator has to be wrapped in
+``replica_stream`` to read from the replica. Views that cache their
+response render cache misses inside ``use_primary`` (see
+``caching.cached_response``), since a lagging replica read would be
+cached under the new data version.
+
+The flag is a ``ContextVar``, so it is per-thread under WSGI and
+per-task under ASGI.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+@contextmanager
+def _routing(replica):
+    token = _use_replica.set(replica)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def use_replica():
+    return _routing(True)
+
+
+def use_primary():
+    return _routing(False)
+
+
+def replica_stream(iterable):
+    """
+    Yield from ``iterable`` with its reads on the replica.
+
+    The flag is set around each step rather than for the generator's
+    lifetime, because the server may consume each chunk in a different
+    context.
+    """
+    iterator = iter(iterable)
+    while True:
+        with use_replica():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def read_only(view_method):
+    """Route the reads of a view (sync or async) to the replica, if there is one."""
+    if iscoroutinefunction(view_method):
+        @wraps(view_method)
+        async def async_wrapper(*args, **kwargs):
+            with use_replica():
+                return await view_method(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(view_method)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return view_method(*args, **kwargs)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+        if alias and _use_replica.get():
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
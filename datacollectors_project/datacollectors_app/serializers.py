@@ -5,12 +5,74 @@ class TeamMemberSerializer(serializers.ModelSerializer):
     class Meta:
         model = TeamMember
         fields = '__all__'
+        read_only_fields = ('rating_count', 'rating_sum', 'average_rating', 'rotation_seq')
+
+
+class TeamMemberImportSerializer(serializers.ModelSerializer):
+    """
+    One row of a roster import.
+
+    ``ve_code`` is not checked for uniqueness here: imports upsert on it,
+    so an existing ve_code is an update rather than an error. ``status``
+    and ``projects_count`` are left out: allocation owns them.
+    """
+    class Meta:
+        model = TeamMember
+        fields = (
+            've_code', 'name', 'role', 'experience_level', 'performance_score',
+            'rotation_rank',
+        )
+        extra_kwargs = {'ve_code': {'validators': []}}
+
+
+class TeamMemberReadSerializer(TeamMemberSerializer):
+    """
+    Team member with the names of the projects they are assigned to.
+
+    Reads ``projects`` through ``instance.projects.all()`` so that a
+    queryset with ``projects`` prefetched is serialized without any
+    further queries.
+    """
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        assigned_projects = [p.name for p in instance.projects.all()]
+        data['assigned_projects'] = assigned_projects
+        data['current_project'] = assigned_projects[0] if assigned_projects else None
+        data['assigned_projects_count'] = len(assigned_projects)
+        return data
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = '__all__'
 
+class ProjectStaffingSerializer(ProjectSerializer):
+    """Project with the staffing counts from ``Project.objects.with_staffing()``."""
+    members_assigned = serializers.IntegerField(read_only=True)
+    collectors_assigned = serializers.IntegerField(read_only=True)
+    supervisors_assigned = serializers.IntegerField(read_only=True)
+    is_fully_staffed = serializers.BooleanField(read_only=True)
+    duration_days = serializers.IntegerField(read_only=True)
+
+
 class RatingsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ratings
         fields='__all__'
+
+
+class RatingBulkRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk rating upload.
+
+    ``team_member`` is a ve_code or a team member id and ``project`` a
+    project name or id; both are resolved by ``RatingBulkView`` for the
+    whole batch at once.
+    """
+    team_member = serializers.CharField()
+    project = serializers.CharField()
+    rating = serializers.IntegerField(min_value=1, max_value=5, required=False, allow_null=True)
+    feedback = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    rated_by = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
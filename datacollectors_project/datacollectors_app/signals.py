@@ -0,0 +1,82 @@
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .caching import bump_data_version_on_commit
+from .models import DeletionLog, Project, Ratings, TeamMember
+
+
+@receiver(post_save, sender=TeamMember)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Ratings)
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Ratings)
+def data_changed(sender, using=None, **kwargs):
+    bump_data_version_on_commit(using)
+
+
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Ratings)
+def leave_tombstone(sender, instance, using=None, origin=None, **kwargs):
+    # Fires for queryset deletes too, so every deletion reaches sync
+    # clients. Ratings deleted along with their member or project are
+    # recorded in one insert by the parent's receivers below.
+    if sender is Ratings and deletion_origin(origin) in (TeamMember, Project):
+        return
+    DeletionLog.objects.using(using).record(sender, [instance.pk])
+
+
+@receiver(m2m_changed, sender=TeamMember.projects.through)
+def assignments_changed(sender, action, using=None, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_data_version_on_commit(using)
+
+
+def deletion_origin(origin):
+    """The model whose ``delete()`` call is deleting the current row."""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver(post_save, sender=Ratings)
+def rating_saved(sender, instance, using=None, **kwargs):
+    # A rating moved to another member changes both members' aggregates.
+    member_ids = {instance.team_member_id, getattr(instance, '_loaded_team_member_id', None)}
+    TeamMember.objects.using(using).filter(pk__in=member_ids - {None}).refresh_rating_stats()
+    instance._loaded_team_member_id = instance.team_member_id
+
+
+@receiver(post_delete, sender=Ratings)
+def rating_deleted(sender, instance, using=None, origin=None, **kwargs):
+    # Ratings deleted along with their member need no refresh, and those
+    # deleted along with their project are refreshed once per project.
+    if deletion_origin(origin) is Ratings:
+        TeamMember.objects.using(using).filter(pk=instance.team_member_id).refresh_rating_stats()
+
+
+@receiver(pre_delete, sender=TeamMember)
+def member_deleting(sender, instance, using=None, **kwargs):
+    instance._cascaded_ratings = list(
+        Ratings.objects.using(using).filter(team_member=instance).values_list('pk', 'team_member_id')
+    )
+
+
+@receiver(pre_delete, sender=Project)
+def project_deleting(sender, instance, using=None, **kwargs):
+    instance._cascaded_ratings = list(
+        Ratings.objects.using(using).filter(project=instance).values_list('pk', 'team_member_id')
+    )
+
+
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_delete, sender=Project)
+def ratings_cascaded(sender, instance, using=None, **kwargs):
+    ratings = getattr(instance, '_cascaded_ratings', None)
+    if not ratings:
+        return
+    DeletionLog.objects.using(using).record(Ratings, [pk for pk, _ in ratings])
+    if sender is Project:
+        TeamMember.objects.using(using).filter(
+            pk__in={member_id for _, member_id in ratings}
+        ).refresh_rating_stats()
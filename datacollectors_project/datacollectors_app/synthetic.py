@@ -0,0 +1,150 @@
+"""
+Synthetic roster, project and rating data for benchmarks.
+
+``generate`` inserts everything with batched ``bulk_create`` and then
+brings the derived columns (``projects_count``, ``status`` and the rating
+aggregates) in line with one ``UPDATE`` each, so the data looks like
+what the API itself would have produced. Output is reproducible for a
+given ``seed``; ve_codes and project names carry a prefix derived from
+it, so runs with different seeds can share a database.
+"""
+import random
+import uuid
+from datetime import date, timedelta
+from itertools import islice
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .caching import bump_data_version_on_commit
+from .models import Project, Ratings, TeamMember
+
+FIRST_NAMES = (
+    'Aline', 'Brian', 'Claudine', 'David', 'Esther', 'Fabrice', 'Grace', 'Herve', 'Innocent',
+    'Jeanne', 'Kevin', 'Liliane', 'Moses', 'Nadine', 'Olivier', 'Patience', 'Rachel', 'Samuel',
+)
+LAST_NAMES = (
+    'Habimana', 'Ingabire', 'Kamanzi', 'Mugisha', 'Mukamana', 'Niyonzima', 'Nshimiyimana',
+    'Uwase', 'Uwimana', 'Mutesi', 'Gatete', 'Byiringiro',
+)
+EXPERIENCE_WEIGHTS = {'regular': 50, 'foa': 20, 'new_enumerator': 15, 'backchecker': 10, 'supervisor': 5}
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def generate(members=50000, projects=2000, ratings=500000, team_size=(5, 30), seed=1,
+             batch_size=5000, log=None):
+    """
+    Insert ``members`` team members, ``projects`` projects staffed with
+    ``team_size`` members each while active, and ``ratings`` ratings on
+    distinct (member, project) pairs. Returns the row counts and the
+    per-run prefix.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    prefix = f'SYN{uuid.UUID(int=rng.getrandbits(128)).hex[:6]}'
+    levels, weights = zip(*EXPERIENCE_WEIGHTS.items())
+    today = date.today()
+
+    def member_rows():
+        for i in range(members):
+            yield TeamMember(
+                ve_code=f'{prefix}{i:07d}',
+                name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}',
+                role='supervisor' if rng.random() < 0.1 else 'data_collector',
+                experience_level=rng.choices(levels, weights)[0],
+                performance_score=rng.randint(30, 100),
+                rotation_rank=rng.randint(1, 10),
+                status='inactive' if rng.random() < 0.02 else 'available',
+            )
+
+    for batch in batched(member_rows(), batch_size):
+        TeamMember.objects.bulk_create(batch)
+    log(f"{members} team members")
+
+    def project_rows():
+        for i in range(projects):
+            start = today - timedelta(days=rng.randint(-30, 720))
+            end = start + timedelta(days=rng.randint(14, 180))
+            status = 'completed' if end < today else ('upcoming' if start > today else 'active')
+            yield Project(
+                name=f'{prefix} Project {i:05d}',
+                scrum_master=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                start_date=start,
+                end_date=end,
+                status=status,
+                num_collectors_needed=rng.randint(*team_size),
+                num_supervisors_needed=rng.randint(1, 3),
+                created_at=timezone.now() - timedelta(days=(today - start).days + 7),
+            )
+
+    for batch in batched(project_rows(), batch_size):
+        Project.objects.bulk_create(batch)
+    log(f"{projects} projects")
+
+    # bulk_create does not return primary keys on every backend (MySQL).
+    member_ids = list(TeamMember.objects.filter(ve_code__startswith=prefix).values_list('pk', flat=True))
+    active = list(
+        Project.objects.filter(name__startswith=prefix, status='active')
+        .values_list('pk', 'num_collectors_needed', 'num_supervisors_needed')
+    )
+    project_ids = list(Project.objects.filter(name__startswith=prefix).values_list('pk', flat=True))
+
+    Assignment = TeamMember.projects.through
+    assignments = (
+        Assignment(teammember_id=member_id, project_id=project_id)
+        for project_id, collectors, supervisors in active
+        for member_id in rng.sample(member_ids, min(collectors + supervisors, len(member_ids)))
+    )
+    assigned = 0
+    for batch in batched(assignments, batch_size):
+        Assignment.objects.bulk_create(batch)
+        assigned += len(batch)
+    log(f"{assigned} assignments")
+
+    ratings = min(ratings, len(member_ids) * len(project_ids))
+    # A dict rather than a set keeps the draw order, and so the ratings,
+    # independent of the primary key values.
+    pairs = {}
+    while len(pairs) < ratings:
+        pairs[rng.choice(member_ids), rng.choice(project_ids)] = None
+    rating_rows = (
+        Ratings(
+            team_member_id=member_id,
+            project_id=project_id,
+            rating=rng.choices((1, 2, 3, 4, 5), (5, 10, 25, 35, 25))[0],
+            feedback=rng.choice(('', 'Punctual and thorough.', 'Needs supervision.', 'Excellent data quality.')),
+            rated_by='synthetic',
+        )
+        for member_id, project_id in pairs
+    )
+    for batch in batched(rating_rows, batch_size):
+        Ratings.objects.bulk_create(batch)
+    log(f"{ratings} ratings")
+
+    synthetic = TeamMember.objects.filter(ve_code__startswith=prefix)
+    synthetic.update(
+        projects_count=Coalesce(
+            Subquery(
+                Assignment.objects.filter(teammember_id=OuterRef('pk'))
+                .values('teammember_id').annotate(n=Count('pk')).values('n')
+            ),
+            0,
+        ),
+    )
+    synthetic.filter(projects_count__gt=0).update(status='deployed')
+    synthetic.refresh_rating_stats()
+    bump_data_version_on_commit()
+
+    return {
+        'prefix': prefix,
+        'members': members,
+        'projects': projects,
+        'assignments': assigned,
+        'ratings': ratings,
+    }
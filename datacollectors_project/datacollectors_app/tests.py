@@ -1,3 +1,1755 @@
-from django.test import TestCase
+import csv
+import json
+import random
+import re
+import statistics
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from importlib.util import find_spec
+from io import BytesIO, StringIO
+from tempfile import NamedTemporaryFile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.base import BaseHandler
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse
+from django.test import Client, LiveServerTestCase, RequestFactory, TransactionTestCase, override_settings, skipUnlessDBFeature, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.test import TestCase as DjangoTestCase
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.connection import ConnectionDoesNotExist
+
+from .benchmarks import compare, run_suite
+from .allocation import assign_members, locked_picks, release_members, select_members
+from .middleware import RequestInstrumentationMiddleware, sql_signature
+from .roster import import_roster
+from .routers import ReadReplicaRouter, use_replica
+from .synthetic import generate
+from .models import DeletionLog, TeamMember, Project, Ratings
+
+
+
+# The test client is a single process, so the local-memory cache is
+# shared by every request it makes.
+@override_settings(RESPONSE_CACHE_ALLOW_LOCAL=True)
+class TestCase(DjangoTestCase):
+    # Data-version bumps run on commit, which never happens inside a
+    # TestCase, so each test starts from an empty response cache instead.
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+def make_members(count, prefix='M', **fields):
+    return TeamMember.objects.bulk_create([
+        TeamMember(
+            ve_code=f'{prefix}{i:05d}',
+            name=f'{prefix} Member {i:05d}',
+            role=fields.get('role', 'data_collector'),
+            **{k: v for k, v in fields.items() if k != 'role'}
+        )
+        for i in range(count)
+    ])
+
+
+class TeamMemberListTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.project_a = Project.objects.create(name='Household Survey')
+        self.project_b = Project.objects.create(name='Market Census')
+
+    def assign(self, members, *projects):
+        for member in members:
+            member.projects.add(*projects)
+
+    def test_list_includes_assigned_projects(self):
+        member, idle = make_members(2)
+        self.assign([member], self.project_a, self.project_b)
+
+        response = self.client.get(reverse('teammember-list'))
+
+        self.assertEqual(response.status_code, 200)
+        data = {item['ve_code']: item for item in response.json()['data']}
+        self.assertEqual(
+            sorted(data[member.ve_code]['assigned_projects']),
+            ['Household Survey', 'Market Census'],
+        )
+        self.assertEqual(data[member.ve_code]['assigned_projects_count'], 2)
+        self.assertIn(data[member.ve_code]['current_project'], ['Household Survey', 'Market Census'])
+        self.assertEqual(data[idle.ve_code]['assigned_projects'], [])
+        self.assertIsNone(data[idle.ve_code]['current_project'])
+        self.assertEqual(data[idle.ve_code]['assigned_projects_count'], 0)
+
+    def test_list_query_count_does_not_grow_with_members(self):
+        url = reverse('teammember-list')
+        self.assign(make_members(3, prefix='A'), self.project_a)
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+        self.assign(make_members(40, prefix='B'), self.project_a, self.project_b)
+        cache.clear()
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()['data']), 43)
+
+    def test_retrieve_and_update_share_read_representation(self):
+        member, = make_members(1)
+        self.assign([member], self.project_a)
+        url = reverse('teammember-detail', args=[member.pk])
+
+        retrieved = self.client.get(url).json()['data']
+        updated = self.client.put(
+            url, {'performance_score': 80}, content_type='application/json'
+        ).json()['data']
+
+        self.assertEqual(retrieved['assigned_projects'], ['Household Survey'])
+        self.assertEqual(updated['assigned_projects'], ['Household Survey'])
+        self.assertEqual(updated['current_project'], 'Household Survey')
+        self.assertEqual(updated['performance_score'], 80)
+        self.assertEqual(set(retrieved), set(updated))
+
+
+class TeamMemberPaginationTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        TeamMember.objects.bulk_create([
+            TeamMember(ve_code=f'VE{i:03d}', name=name, role='data_collector')
+            for i, name in enumerate(['Carol', 'Alice', 'Bob', 'Alice', 'Dave'])
+        ])
+        self.url = reverse('teammember-list')
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()['data']), 5)
+        self.assertNotIn('next', response.json())
+
+    def test_cursor_pages_follow_name_then_id(self):
+        seen = []
+        url = f'{self.url}?page_size=2'
+        while url:
+            body = self.client.get(url).json()
+            seen.extend((item['name'], item['id']) for item in body['data'])
+            url = body['next']
+        self.assertEqual(seen, sorted(TeamMember.objects.values_list('name', 'id')))
+
+    def test_ndjson_stream(self):
+        response = self.client.get(f'{self.url}?stream=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        names = [json.loads(line)['name'] for line in lines]
+        self.assertEqual(names, ['Alice', 'Alice', 'Bob', 'Carol', 'Dave'])
+
+    def test_stream_reads_in_keyset_chunks(self):
+        with mock.patch('datacollectors_app.views.TeamMemberViewSet.stream_chunk_size', 2), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.url}?stream=ndjson')
+            lines = b''.join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual([json.loads(line)['ve_code'] for line in lines], ['VE001', 'VE003', 'VE002', 'VE000', 'VE004'])
+        members = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT "datacollectors_app_teammember"')]
+        self.assertEqual(len(members), 3)
+        self.assertTrue(all('LIMIT 2' in sql for sql in members), members)
+
+    def test_json_array_stream_keeps_envelope(self):
+        response = self.client.get(f'{self.url}?stream=json&status=available')
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(body['data']), 5)
+        self.assertIn('assigned_projects', body['data'][0])
+
+    def test_unknown_stream_format(self):
+        response = self.client.get(f'{self.url}?stream=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+def assignment_payload(project_name, num_collectors=0, num_supervisors=0, **extra):
+    payload = {
+        'projectName': project_name,
+        'name': 'Scrum Master',
+        'startDate': '2025-01-01',
+        'endDate': '2025-02-01',
+        'status': 'active',
+        'numCollectors': num_collectors,
+        'numSupervisors': num_supervisors,
+    }
+    payload.update(extra)
+    return payload
+
+
+class AssignProjectTests(TestCase):
+    url = reverse('assign_project')
+
+    def post(self, payload, **extra):
+        return self.client.post(self.url, payload, content_type='application/json', **extra)
+
+    def test_assigns_in_rotation_order_and_keeps_response_shape(self):
+        make_members(3, prefix='LOW', rotation_rank=1)
+        make_members(3, prefix='HIGH', rotation_rank=5, role='supervisor')
+        deployed, = make_members(1, prefix='BUSY', rotation_rank=1, status='deployed')
+
+        response = self.post(assignment_payload('Survey', num_collectors=3, num_supervisors=2))
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['message'], '3 data collectors and 2 supervisors assigned to project Survey.')
+        self.assertEqual(body['project_details']['num_collectors_assigned'], 3)
+        self.assertEqual(body['project_details']['duration_days'], 31)
+        self.assertTrue(all(m['name'].startswith('LOW') for m in body['assigned_collectors']))
+        self.assertTrue(all(m['previous_status'] == 'deployed' for m in body['assigned_collectors']))
+        self.assertTrue(all(m['name'].startswith('HIGH') for m in body['assigned_supervisors']))
+
+        project = Project.objects.get(name='Survey')
+        self.assertEqual(project.team_members.count(), 5)
+        self.assertFalse(project.team_members.filter(pk=deployed.pk).exists())
+        for member in project.team_members.all():
+            self.assertEqual(member.status, 'deployed')
+            self.assertEqual(member.projects_count, 1)
+
+    def test_falls_back_to_unavailable_members_for_collectors(self):
+        make_members(2, prefix='FREE')
+        make_members(2, prefix='BUSY', status='deployed', projects_count=1)
+
+        body = self.post(assignment_payload('Survey', num_collectors=3, num_supervisors=1)).json()
+
+        names = [m['name'] for m in body['assigned_collectors']]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(sum(name.startswith('BUSY') for name in names), 1)
+        self.assertEqual(body['assigned_supervisors'], [])
+        self.assertEqual(
+            sorted(TeamMember.objects.filter(projects__name='Survey').values_list('projects_count', flat=True)),
+            [1, 1, 2],
+        )
+
+    def test_quotas_are_filled_by_role(self):
+        make_members(4, prefix='DC', rotation_rank=1)
+        make_members(2, prefix='SUP', rotation_rank=9, role='supervisor')
+        make_members(2, prefix='EXP', rotation_rank=5, experience_level='supervisor')
+
+        body = self.post(assignment_payload('Survey', num_collectors=3, num_supervisors=4)).json()
+
+        self.assertEqual([m['role'] for m in body['assigned_collectors']], ['data_collector'] * 3)
+        self.assertTrue(all(m['name'].startswith('DC') for m in body['assigned_collectors']))
+        # Both supervisors first, then experienced collectors stand in.
+        self.assertEqual(
+            [m['name'][:3] for m in body['assigned_supervisors']],
+            ['SUP', 'SUP', 'EXP', 'EXP'],
+        )
+
+    def test_collectors_never_taken_from_supervisors(self):
+        make_members(2, prefix='SUP', role='supervisor')
+
+        body = self.post(assignment_payload('Survey', num_collectors=2)).json()
+
+        self.assertEqual(body['assigned_collectors'], [])
+        self.assertEqual(TeamMember.objects.filter(status='deployed').count(), 0)
+
+    def test_idempotency_key_replays_the_first_response(self):
+        make_members(6)
+        payload = assignment_payload('Survey', num_collectors=2)
+
+        first = self.post(payload, HTTP_IDEMPOTENCY_KEY='retry-1')
+        second = self.post(payload, HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(Project.objects.get(name='Survey').team_members.count(), 2)
+        self.assertEqual(TeamMember.objects.filter(status='deployed').count(), 2)
+
+    def test_idempotency_key_reused_with_different_request(self):
+        make_members(6)
+        self.post(assignment_payload('Survey', num_collectors=2), HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        response = self.post(assignment_payload('Survey', num_collectors=4), HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(TeamMember.objects.filter(status='deployed').count(), 2)
+
+
+class AssignProjectPreviewTests(TestCase):
+    url = reverse('assign_project')
+
+    def setUp(self):
+        super().setUp()
+        make_members(6, prefix='DC')
+        make_members(2, prefix='SUP', role='supervisor')
+
+    def preview(self, payload):
+        return self.client.post(f'{self.url}?dry_run=true', payload, content_type='application/json')
+
+    def commit(self, payload, token):
+        return self.client.post(self.url, dict(payload, previewToken=token), content_type='application/json')
+
+    def test_preview_writes_nothing_and_reuses_the_pool_snapshot(self):
+        payload = assignment_payload('Survey', num_collectors=3, num_supervisors=1)
+
+        first = self.preview(payload).json()
+        with self.assertNumQueries(1):
+            second = self.preview(dict(payload, numCollectors=5)).json()
+
+        self.assertTrue(first['dry_run'])
+        self.assertTrue(first['message'].startswith('Preview: 3 data collectors and 1 supervisors'))
+        self.assertEqual(len(second['assigned_collectors']), 5)
+        self.assertFalse(Project.objects.exists())
+        self.assertFalse(TeamMember.objects.filter(status='deployed').exists())
+
+    def test_commit_with_token_assigns_the_previewed_team(self):
+        payload = assignment_payload('Survey', num_collectors=3, num_supervisors=1)
+        preview = self.preview(payload).json()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.commit(payload, preview['preview_token'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [m['name'] for m in response.json()['assigned_collectors']],
+            [m['name'] for m in preview['assigned_collectors']],
+        )
+        self.assertEqual(Project.objects.get(name='Survey').team_members.count(), 4)
+        self.assertEqual(self.commit(payload, preview['preview_token']).json()['error'], 'preview_expired')
+        # The committed assignment dropped the pool snapshot.
+        repeat = self.preview(assignment_payload('Other', num_collectors=3)).json()
+        self.assertEqual([m['previous_status'] for m in repeat['assigned_collectors']], ['available'] * 3)
+
+    def test_negative_or_malformed_quotas_are_rejected(self):
+        for quotas in ({'numSupervisors': -1}, {'numCollectors': -3}, {'numCollectors': 'many'}):
+            with self.subTest(quotas=quotas):
+                payload = dict(assignment_payload('Survey', num_collectors=3, num_supervisors=1), **quotas)
+                self.assertEqual(self.preview(payload).status_code, 400)
+                self.assertEqual(self.client.post(self.url, payload, content_type='application/json').status_code, 400)
+        self.assertFalse(Project.objects.exists())
+
+    def test_stale_preview_is_rejected(self):
+        payload = assignment_payload('Survey', num_collectors=3)
+        preview = self.preview(payload).json()
+        self.client.post(self.url, assignment_payload('Other', num_collectors=1), content_type='application/json')
+
+        response = self.commit(payload, preview['preview_token'])
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['error'], 'preview_stale')
+        self.assertFalse(Project.objects.filter(name='Survey').exists())
+
+    def test_token_must_match_the_request(self):
+        payload = assignment_payload('Survey', num_collectors=3)
+        preview = self.preview(payload).json()
+
+        response = self.commit(dict(payload, numCollectors=4), preview['preview_token'])
+
+        self.assertEqual(response.status_code, 422)
+
+
+def attach(project, members):
+    Assignment = TeamMember.projects.through
+    Assignment.objects.bulk_create([
+        Assignment(teammember_id=member.pk, project_id=project.pk) for member in members
+    ])
+
+
+class DeleteProjectTests(TestCase):
+    url = reverse('assign_project')
+
+    def delete(self, project_name):
+        return self.client.delete(self.url, {'project_name': project_name}, content_type='application/json')
+
+    def test_unassigns_members_and_reports_them(self):
+        survey = Project.objects.create(name='Survey')
+        census = Project.objects.create(name='Census')
+        solo, shared = make_members(2, status='deployed', projects_count=2)
+        attach(survey, [solo, shared])
+        attach(census, [shared])
+        Ratings.objects.create(team_member=solo, project=survey, rating=4)
+
+        response = self.delete('Survey')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['summary'], {'total_unassigned': 2, 'made_available': 1, 'still_deployed': 1})
+        self.assertEqual(body['unassigned_members'][0], {
+            'id': solo.pk, 'name': solo.name, 've_code': solo.ve_code, 'role': 'data_collector',
+            'previous_status': 'deployed', 'previous_project_count': 2,
+        })
+        self.assertEqual(body['members_made_available'], [{'name': solo.name, 've_code': solo.ve_code}])
+        self.assertEqual(body['members_still_deployed'], [
+            {'name': shared.name, 've_code': shared.ve_code, 'remaining_projects': ['Census']}
+        ])
+        self.assertEqual(body['deleted_project']['name'], 'Survey')
+
+        solo.refresh_from_db()
+        shared.refresh_from_db()
+        self.assertEqual((solo.status, solo.projects_count), ('available', 0))
+        self.assertEqual((shared.status, shared.projects_count), ('deployed', 1))
+        self.assertFalse(Project.objects.filter(name='Survey').exists())
+        self.assertFalse(Ratings.objects.exists())
+
+    def test_missing_project(self):
+        self.assertEqual(self.delete('Nope').status_code, 404)
+
+    def deletion_queries(self, project_name, members):
+        project = Project.objects.create(name=project_name)
+        attach(project, members)
+        # End-of-project reviews: every member has rated work on it.
+        Ratings.objects.bulk_create([Ratings(team_member=m, project=project, rating=4) for m in members])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.delete(project_name)
+        self.assertEqual(response.json()['summary']['total_unassigned'], len(members))
+        return len(queries)
+
+    def test_query_count_is_constant_for_1000_members(self):
+        census = Project.objects.create(name='Census')
+        small = make_members(10, prefix='S', status='deployed')
+        large = make_members(1000, prefix='L', status='deployed')
+        attach(census, small[:5] + large[:500])
+
+        self.assertEqual(
+            self.deletion_queries('Small', small),
+            self.deletion_queries('Large', large),
+        )
+        self.assertEqual(TeamMember.objects.filter(status='available').count(), 505)
+        self.assertEqual(DeletionLog.objects.filter(model='ratings').count(), 1010)
+        self.assertFalse(TeamMember.objects.filter(rating_count__gt=0).exists())
+
+
+class ProjectDashboardTests(TestCase):
+    url = reverse('assign_project')
+
+    def make_projects(self, count, status='active', prefix='Project'):
+        start = timezone.now() - timedelta(days=count)
+        projects = Project.objects.bulk_create([
+            Project(name=f'{prefix} {i:03d}', status=status, created_at=start + timedelta(days=i))
+            for i in range(count)
+        ])
+        for project in projects:
+            attach(project, make_members(2, prefix=f'{project.name} DC '))
+            attach(project, make_members(1, prefix=f'{project.name} SUP ', role='supervisor'))
+        return projects
+
+    def test_dashboard_splits_members_by_role(self):
+        self.make_projects(1)
+
+        info = self.client.get(self.url).json()['active_projects']['Project 000']
+
+        self.assertEqual(info['project_info']['total_collectors'], 2)
+        self.assertEqual(info['project_info']['total_supervisors'], 1)
+        self.assertEqual([m['role'] for m in info['data_collectors']], ['data_collector'] * 2)
+        self.assertEqual([m['role'] for m in info['supervisors']], ['supervisor'])
+
+    def test_query_count_does_not_grow_with_projects(self):
+        self.make_projects(2, prefix='Small')
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        self.make_projects(20, prefix='Large')
+        cache.clear()
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()['active_projects']), 22)
+
+    def test_filter_by_status_and_paginate(self):
+        self.make_projects(5, status='active')
+        self.make_projects(3, status='completed', prefix='Old')
+
+        active = self.client.get(f'{self.url}?status=active').json()['active_projects']
+        self.assertEqual(len(active), 5)
+
+        names = []
+        url = f'{self.url}?status=active,completed&page_size=3'
+        while url:
+            body = self.client.get(url).json()
+            names.extend(body['active_projects'])
+            url = body['next']
+        self.assertEqual(names, list(Project.objects.order_by('-created_at').values_list('name', flat=True)))
+
+
+class RatingStatsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.member, self.other = make_members(2)
+        self.survey = Project.objects.create(name='Survey')
+        self.census = Project.objects.create(name='Census')
+
+    def stats(self, member):
+        member.refresh_from_db()
+        return member.rating_count, member.rating_sum, member.average_rating
+
+    def test_stats_follow_create_update_and_delete(self):
+        response = self.client.post(
+            reverse('rate'),
+            {'team_member': self.member.pk, 'project': self.survey.pk, 'rating': 4},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        rating = Ratings.objects.create(team_member=self.member, project=self.census, rating=5)
+        Ratings.objects.create(team_member=self.member, project=Project.objects.create(name='Pilot'))
+        self.assertEqual(self.stats(self.member), (2, 9, 4.5))
+
+        rating = Ratings.objects.get(pk=rating.pk)
+        rating.rating = 2
+        rating.save()
+        self.assertEqual(self.stats(self.member), (2, 6, 3.0))
+
+        rating.team_member = self.other
+        rating.save()
+        self.assertEqual(self.stats(self.member), (1, 4, 4.0))
+        self.assertEqual(self.stats(self.other), (1, 2, 2.0))
+
+        rating.delete()
+        self.assertEqual(self.stats(self.other), (0, 0, None))
+
+    def test_project_deletion_refreshes_stats(self):
+        Ratings.objects.create(team_member=self.member, project=self.survey, rating=1)
+        Ratings.objects.create(team_member=self.member, project=self.census, rating=4)
+
+        self.client.delete(reverse('assign_project'), {'project_name': 'Survey'}, content_type='application/json')
+
+        self.assertEqual(self.stats(self.member), (1, 4, 4.0))
+
+    def test_queryset_deletes_refresh_stats(self):
+        Ratings.objects.create(team_member=self.member, project=self.survey, rating=1)
+        Ratings.objects.create(team_member=self.member, project=self.census, rating=4)
+        Ratings.objects.create(team_member=self.other, project=self.census, rating=5)
+
+        Ratings.objects.filter(project=self.survey).delete()
+        self.assertEqual(self.stats(self.member), (1, 4, 4.0))
+
+        with CaptureQueriesContext(connection) as queries:
+            Project.objects.filter(pk=self.census.pk).delete()
+        self.assertEqual(self.stats(self.member), (0, 0, None))
+        self.assertEqual(self.stats(self.other), (0, 0, None))
+        refreshes = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(refreshes), 1)
+
+    def test_refresh_moves_updated_at(self):
+        before = self.member.updated_at
+        Ratings.objects.create(team_member=self.member, project=self.survey, rating=5)
+        self.member.refresh_from_db()
+        self.assertGreater(self.member.updated_at, before)
+
+    def test_rebuild_command(self):
+        Ratings.objects.create(team_member=self.member, project=self.survey, rating=3)
+        TeamMember.objects.update(rating_count=0, rating_sum=0, average_rating=None)
+
+        call_command('rebuild_rating_stats', stdout=StringIO())
+
+        self.assertEqual(self.stats(self.member), (1, 3, 3.0))
+        self.assertEqual(self.stats(self.other), (0, 0, None))
+
+    def test_aggregates_are_read_only_through_the_api(self):
+        url = reverse('teammember-detail', args=[self.member.pk])
+        self.client.put(url, {'rating_count': 99, 'average_rating': 5}, content_type='application/json')
+        self.assertEqual(self.stats(self.member), (0, 0, None))
+
+
+class RatingBulkTests(TestCase):
+    url = reverse('rate_bulk')
+
+    def setUp(self):
+        super().setUp()
+        self.members = make_members(3)
+        self.survey = Project.objects.create(name='Survey')
+
+    def upload(self, rows):
+        return self.client.post(self.url, rows, content_type='application/json')
+
+    def test_upserts_rows_and_reports_each_one(self):
+        Ratings.objects.create(team_member=self.members[0], project=self.survey, rating=1, feedback='old')
+
+        response = self.upload([
+            {'team_member': self.members[0].ve_code, 'project': 'Survey', 'rating': 5, 'feedback': 'great'},
+            {'team_member': str(self.members[1].pk), 'project': str(self.survey.pk), 'rating': 3},
+            {'team_member': 'NOPE', 'project': 'Survey', 'rating': 3},
+            {'team_member': self.members[2].ve_code, 'project': 'Survey', 'rating': 9},
+            {'team_member': self.members[1].ve_code, 'project': 'Survey', 'rating': 4},
+        ])
+
+        body = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body['summary'], {'created': 1, 'updated': 1, 'failed': 3})
+        self.assertEqual([r['status'] for r in body['results']], ['updated', 'created', 'error', 'error', 'error'])
+        self.assertIn('team_member', body['results'][2]['errors'])
+        self.assertIn('rating', body['results'][3]['errors'])
+        self.assertIn('non_field_errors', body['results'][4]['errors'])
+
+        updated = Ratings.objects.get(team_member=self.members[0], project=self.survey)
+        self.assertEqual((updated.rating, updated.feedback), (5, 'great'))
+        self.members[0].refresh_from_db()
+        self.assertEqual(self.members[0].average_rating, 5.0)
+
+    def test_rejects_non_list_payload(self):
+        self.assertEqual(self.upload({'team_member': 'x'}).status_code, 400)
+
+
+class RatingListTests(TestCase):
+    url = reverse('rate')
+
+    def setUp(self):
+        super().setUp()
+        self.alice, self.bob = make_members(2)
+        self.survey = Project.objects.create(name='Survey')
+        self.census = Project.objects.create(name='Census')
+        now = timezone.now()
+        for member, project, rating, days_ago in [
+            (self.alice, self.survey, 5, 10),
+            (self.alice, self.census, 3, 5),
+            (self.bob, self.survey, 4, 1),
+            (self.bob, self.census, None, 0),
+        ]:
+            Ratings.objects.create(team_member=member, project=project, rating=rating)
+            Ratings.objects.filter(team_member=member, project=project).update(
+                created_at=now - timedelta(days=days_ago)
+            )
+
+    def get(self, query=''):
+        return self.client.get(f'{self.url}?{query}')
+
+    def test_filters(self):
+        def ratings(query):
+            return sorted(row['rating'] or 0 for row in self.get(query).json())
+
+        self.assertEqual(ratings(f've_code={self.alice.ve_code}'), [3, 5])
+        self.assertEqual(ratings(f'project={self.survey.pk}'), [4, 5])
+        self.assertEqual(ratings('project_name=Census&min_rating=2'), [3])
+        self.assertEqual(ratings('min_rating=4&max_rating=4'), [4])
+        since = (timezone.now() - timedelta(days=2)).date().isoformat()
+        self.assertEqual(ratings(f'created_after={since}'), [0, 4])
+        self.assertEqual(self.get('min_rating=high').status_code, 400)
+        self.assertEqual(self.get('created_after=yesterday').status_code, 400)
+        self.assertEqual(self.get('created_after=2025-13-01').status_code, 400)
+        self.assertEqual(self.get('created_before=2025-02-30T10:00:00').status_code, 400)
+
+    def test_keyset_pagination_on_created_at(self):
+        seen = []
+        url = f'{self.url}?page_size=3'
+        # The conditional-GET check, then the page itself.
+        with self.assertNumQueries(2):
+            body = self.client.get(url).json()
+        while True:
+            seen.extend(row['id'] for row in body['results'])
+            if not body['next']:
+                break
+            body = self.client.get(body['next']).json()
+        self.assertEqual(seen, list(Ratings.objects.order_by('-created_at').values_list('id', flat=True)))
+
+    def test_summary_aggregates_in_sql(self):
+        # The conditional-GET check, then one query per grouping.
+        with self.assertNumQueries(3):
+            summary = self.get('summary=true').json()
+
+        by_project = {row['project__name']: row for row in summary['by_project']}
+        self.assertEqual(by_project['Survey']['count'], 2)
+        self.assertEqual(by_project['Survey']['average'], 4.5)
+        self.assertEqual(by_project['Survey']['histogram'], {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1})
+        self.assertEqual(by_project['Census']['count'], 1)
+        by_member = {row['team_member__ve_code']: row for row in summary['by_member']}
+        self.assertEqual(by_member[self.alice.ve_code]['average'], 4.0)
+
+        filtered = self.get(f'summary=true&team_member={self.bob.pk}').json()
+        self.assertEqual([row['team_member'] for row in filtered['by_member']], [self.bob.pk])
+
+
+@tag('benchmark')
+class RosterImportBenchmarkTests(TestCase):
+    def import_rows(self, count, chunk_size=500):
+        content = roster_csv([f'VE{i:06d},Member {i},data_collector,{i % 100}' for i in range(count)])
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            report = import_roster(BytesIO(content), 'csv', chunk_size=chunk_size)
+            elapsed = time.perf_counter() - started
+        self.assertEqual(report['failed'], 0)
+        lookups = [q for q in queries.captured_queries if not q['sql'].startswith('INSERT')]
+        return len(lookups), count / elapsed
+
+    def test_round_trips_scale_with_chunks_not_rows(self):
+        one_chunk, _ = self.import_rows(500)
+        many_chunks, rows_per_second = self.import_rows(5000)
+
+        self.assertEqual(many_chunks, one_chunk * 10)
+        print(f"\nroster import: 5000 rows, {rows_per_second:,.0f} rows/s")
+
+
+@tag('benchmark')
+class RatingBulkBenchmarkTests(TestCase):
+    def ingest(self, project_name, members):
+        project = Project.objects.create(name=project_name)
+        rows = [
+            {'team_member': member.ve_code, 'project': project_name, 'rating': i % 5 + 1, 'feedback': 'ok'}
+            for i, member in enumerate(members)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = self.client.post(reverse('rate_bulk'), rows, content_type='application/json')
+            elapsed = time.perf_counter() - started
+        self.assertEqual(response.json()['summary']['created'], len(rows))
+        # The upsert itself may be split into batches by the backend (SQLite
+        # caps bound parameters per statement); everything else is fixed.
+        lookups = [q for q in queries.captured_queries if not q['sql'].startswith('INSERT')]
+        return len(lookups), len(rows) / elapsed
+
+    def test_throughput_and_round_trips(self):
+        members = make_members(1000)
+        small_queries, _ = self.ingest('Pilot', members[:20])
+        large_queries, rows_per_second = self.ingest('Survey', members)
+
+        self.assertEqual(small_queries, large_queries)
+        print(f"\nbulk rating ingestion: 1000 rows, {rows_per_second:,.0f} rows/s")
+
+
+def roster_csv(rows, header='ve_code,name,role,performance_score'):
+    return '\n'.join([header] + rows).encode()
+
+
+class RosterImportTests(TestCase):
+    url = reverse('teammember-import-roster')
+
+    def upload(self, content, name='roster.csv'):
+        return self.client.post(self.url, {'file': SimpleUploadedFile(name, content)})
+
+    def test_creates_updates_and_reports_row_errors(self):
+        existing, = make_members(1, performance_score=10, rotation_rank=7)
+
+        response = self.upload(roster_csv([
+            f'{existing.ve_code},Renamed,supervisor,90',
+            'VE-NEW,New Person,data_collector,',
+            'VE-BAD,Bad Role,pilot,50',
+            'VE-NEW,Duplicate,data_collector,40',
+            ',No Code,data_collector,40',
+        ]))
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()['data']
+        self.assertEqual((report['created'], report['updated'], report['failed']), (1, 1, 3))
+        self.assertEqual([error['row'] for error in report['errors']], [4, 5, 6])
+        self.assertIn('role', report['errors'][0]['errors'])
+
+        existing.refresh_from_db()
+        self.assertEqual((existing.name, existing.role, existing.performance_score), ('Renamed', 'supervisor', 90))
+        self.assertEqual(existing.rotation_rank, 7)
+        self.assertEqual(TeamMember.objects.get(ve_code='VE-NEW').performance_score, 0)
+
+    def test_blank_cells_keep_existing_values(self):
+        supervisor, = make_members(1, role='supervisor', performance_score=88, status='deployed', projects_count=2)
+        other, = make_members(1, prefix='OTHER', performance_score=40)
+
+        report = self.upload(roster_csv([
+            f'{supervisor.ve_code},Renamed,,',
+            f'{other.ve_code},,,75',
+            'VE-NEW,New Person,data_collector,,available,9',
+        ], header='ve_code,name,role,performance_score,status,projects_count')).json()['data']
+
+        self.assertEqual((report['created'], report['updated'], report['failed']), (1, 2, 0))
+        supervisor.refresh_from_db()
+        self.assertEqual(
+            (supervisor.name, supervisor.role, supervisor.performance_score, supervisor.status, supervisor.projects_count),
+            ('Renamed', 'supervisor', 88, 'deployed', 2),
+        )
+        other.refresh_from_db()
+        self.assertEqual((other.name, other.performance_score), ('OTHER Member 00000', 75))
+        new = TeamMember.objects.get(ve_code='VE-NEW')
+        self.assertEqual((new.status, new.projects_count), ('available', 0))
+
+    @skipUnless(find_spec('openpyxl'), 'openpyxl is not installed')
+    def test_xlsx_roster(self):
+        from openpyxl import Workbook
+        workbook = Workbook()
+        workbook.active.append(['VE Code', 'Name', 'Role', 'Rotation Rank'])
+        workbook.active.append(['VE-X1', 'Xlsx Person', 'supervisor', 3])
+        content = BytesIO()
+        workbook.save(content)
+
+        response = self.upload(content.getvalue(), name='roster.xlsx')
+
+        self.assertEqual(response.json()['data']['created'], 1)
+        self.assertEqual(TeamMember.objects.get(ve_code='VE-X1').rotation_rank, 3)
+
+    def test_missing_file(self):
+        self.assertEqual(self.client.post(self.url).status_code, 400)
+
+    def test_unreadable_files(self):
+        latin1 = roster_csv(['VE-L1,Jos\u00e9 Person,data_collector,40']).decode().encode('latin-1')
+        for content, name in [(latin1, 'roster.csv'), (b'not a zip', 'roster.xlsx')]:
+            if name.endswith('.xlsx') and not find_spec('openpyxl'):
+                continue
+            response = self.upload(content, name=name)
+            self.assertEqual(response.status_code, 400, name)
+            self.assertEqual(response.json()['error'], 'invalid_file')
+        self.assertFalse(TeamMember.objects.exists())
+
+    def test_management_command(self):
+        with NamedTemporaryFile(suffix='.csv') as roster_file:
+            roster_file.write(roster_csv(['VE-CMD,Command Person,data_collector,55']))
+            roster_file.flush()
+            out = StringIO()
+            call_command('import_roster', roster_file.name, stdout=out)
+
+        self.assertIn('1 created', out.getvalue())
+        self.assertTrue(TeamMember.objects.filter(ve_code='VE-CMD').exists())
+
+    def test_management_command_rejects_unreadable_file(self):
+        with NamedTemporaryFile(suffix='.csv') as roster_file:
+            roster_file.write(b've_code,name\n\xff\xfe,broken\n')
+            roster_file.flush()
+            with self.assertRaisesMessage(CommandError, 'not valid UTF-8 CSV'):
+                call_command('import_roster', roster_file.name, stdout=StringIO())
+
+
+class AssignmentExportTests(TestCase):
+    url = reverse('export_assignments')
+
+    def setUp(self):
+        super().setUp()
+        self.survey = Project.objects.create(
+            name='Survey', status='completed', start_date=date(2025, 1, 1), end_date=date(2025, 3, 1)
+        )
+        self.census = Project.objects.create(
+            name='Census', status='active', start_date=date(2025, 6, 1), end_date=date(2025, 7, 1)
+        )
+        self.alice, self.bob = make_members(2)
+        attach(self.survey, [self.alice, self.bob])
+        attach(self.census, [self.alice])
+        Ratings.objects.create(team_member=self.alice, project=self.survey, rating=4, feedback='solid')
+
+    def export(self, query=''):
+        return self.client.get(f'{self.url}?{query}')
+
+    def csv_rows(self, query=''):
+        response = self.export(query)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+
+    def test_csv_joins_ratings(self):
+        rows = self.csv_rows()
+
+        self.assertEqual(len(rows), 3)
+        alice_survey = next(r for r in rows if r['project_name'] == 'Survey' and r['ve_code'] == self.alice.ve_code)
+        self.assertEqual((alice_survey['rating'], alice_survey['feedback']), ('4', 'solid'))
+        bob_survey = next(r for r in rows if r['ve_code'] == self.bob.ve_code)
+        self.assertEqual(bob_survey['rating'], '')
+
+    def test_filters(self):
+        self.assertEqual({r['project_name'] for r in self.csv_rows('project_status=active')}, {'Census'})
+        self.assertEqual(
+            {r['project_name'] for r in self.csv_rows('date_from=2025-02-01&date_to=2025-05-01')}, {'Survey'}
+        )
+        open_ended = Project.objects.create(name='Panel', start_date=date(2025, 1, 1))
+        attach(open_ended, [self.bob])
+        self.assertEqual(
+            {r['project_name'] for r in self.csv_rows('date_from=2025-08-01')}, {'Panel'}
+        )
+        self.assertEqual(self.export('date_from=soon').status_code, 400)
+        self.assertEqual(self.export('date_from=2025-13-01').status_code, 400)
+        self.assertEqual(self.export('file_format=xml').status_code, 400)
+
+    def test_reads_in_keyset_chunks(self):
+        attach(Project.objects.create(name='Pilot'), make_members(5, prefix='P'))
+
+        with mock.patch('datacollectors_app.exports.CHUNK_SIZE', 3), \
+                CaptureQueriesContext(connection) as queries:
+            rows = self.csv_rows()
+
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(len({(r['project_id'], r['team_member_id']) for r in rows}), 8)
+        selects = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 3)
+        self.assertTrue(all('LIMIT 3' in sql and 'LEFT OUTER JOIN' in sql for sql in selects), selects)
+
+    @skipUnless(find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+
+        response = self.export('file_format=parquet')
+
+        table = pq.read_table(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(sorted(table.column('project_name').to_pylist()), ['Census', 'Survey', 'Survey'])
+
+
+@skipUnlessDBFeature('has_select_for_update_skip_locked')
+class ConcurrentAssignProjectTests(TransactionTestCase):
+    def test_parallel_allocations_never_double_book(self):
+        make_members(40)
+        barrier = threading.Barrier(4)
+        errors = []
+
+        def allocate(index):
+            try:
+                barrier.wait()
+                response = Client().post(
+                    reverse('assign_project'),
+                    assignment_payload(f'Survey {index}', num_collectors=10),
+                    content_type='application/json',
+                )
+                if response.status_code != 200:
+                    errors.append(response.content)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=allocate, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertFalse(
+            TeamMember.objects.annotate(n=Count('projects')).filter(n__gt=1).exists()
+        )
+        self.assertEqual(TeamMember.objects.filter(status='deployed').count(), 40)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.members = make_members(3)
+        self.url = reverse('teammember-list')
+
+    def test_repeat_reads_are_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.json(), first.json())
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_query_string_is_part_of_the_key(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(f'{self.url}?status=deployed', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], [])
+
+    def test_writes_invalidate_after_commit(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            member = self.members[0]
+            member.name = 'Renamed'
+            member.save()
+            Ratings.objects.create(team_member=member, project=Project.objects.create(name='P'), rating=4)
+        self.assertEqual(len(callbacks), 1)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Renamed', [m['name'] for m in response.json()['data']])
+
+    def test_assignment_invalidates_dashboard(self):
+        make_members(1, prefix='SUP', role='supervisor')
+        dashboard = reverse('assign_project')
+        etag = self.client.get(dashboard)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(dashboard, assignment_payload('Census', num_collectors=2, num_supervisors=1),
+                             content_type='application/json')
+
+        response = self.client.get(dashboard, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['active_projects']), 1)
+
+    @override_settings(RESPONSE_CACHE_ALLOW_LOCAL=False)
+    def test_process_local_cache_is_bypassed(self):
+        # Other workers would never see this worker's version bumps.
+        first = self.client.get(self.url)
+        self.assertNotIn('X-Cache', first)
+        self.assertNotIn('ETag', first)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url).json(), first.json())
+
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+    def test_streaming_and_browsable_responses_bypass_cache(self):
+        streamed = self.client.get(f'{self.url}?stream=ndjson')
+        self.assertTrue(streamed.streaming)
+        self.assertNotIn('ETag', streamed)
+
+        browsable = self.client.get(self.url, HTTP_ACCEPT='text/html')
+        self.assertNotIn('X-Cache', browsable)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.member, self.other = make_members(2)
+        self.project = Project.objects.create(name='Household Survey')
+        attach(self.project, [self.member])
+        self.detail = reverse('teammember-detail', args=[self.member.pk])
+        self.ratings = reverse('rate')
+
+    def test_retrieve_not_modified_costs_one_query(self):
+        first = self.client.get(self.detail)
+        self.assertIn('Last-Modified', first)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.detail, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_member_and_project_changes_change_retrieve_etag(self):
+        etag = self.client.get(self.detail)['ETag']
+
+        self.project.name = 'Renamed Survey'
+        self.project.save()
+        response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['assigned_projects'], ['Renamed Survey'])
+
+        etag = response['ETag']
+        self.member.name = 'Renamed'
+        self.member.save()
+        self.assertEqual(self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_rating_changes_change_retrieve_etag(self):
+        etag = self.client.get(self.detail)['ETag']
+
+        rating = Ratings.objects.create(team_member=self.member, project=self.project, rating=5)
+        response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['average_rating'], 5.0)
+
+        etag = response['ETag']
+        rating.delete()
+        response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['data']['average_rating'])
+
+        etag = response['ETag']
+        self.client.post(reverse('rate_bulk'), [
+            {'team_member': self.member.ve_code, 'project': self.project.name, 'rating': 3},
+        ], content_type='application/json')
+        self.assertEqual(self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_member_still_404s(self):
+        self.assertEqual(self.client.get(reverse('teammember-detail', args=[999999])).status_code, 404)
+
+    def test_rating_list_tracks_inserts_and_deletes(self):
+        Ratings.objects.create(team_member=self.member, project=self.project, rating=4)
+        other = Ratings.objects.create(team_member=self.other, project=self.project, rating=2)
+        etag = self.client.get(self.ratings)['ETag']
+        self.assertEqual(self.client.get(self.ratings, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        other.delete()
+        response = self.client.get(self.ratings, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_rating_etag_depends_on_filters(self):
+        Ratings.objects.create(team_member=self.member, project=self.project, rating=4)
+        etag = self.client.get(self.ratings)['ETag']
+        response = self.client.get(f'{self.ratings}?summary=true', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('by_project', response.json())
+
+
+@override_settings(SYNC_CURSOR_MARGIN_SECONDS=0)
+class SyncTests(TestCase):
+    url = reverse('sync')
+
+    def setUp(self):
+        super().setUp()
+        self.member, self.other = make_members(2)
+        self.project = Project.objects.create(name='Household Survey')
+        attach(self.project, [self.member])
+        self.rating = Ratings.objects.create(team_member=self.other, project=self.project, rating=3)
+
+    def sync(self, since=None):
+        query = {'since': since} if since else {}
+        response = self.client.get(self.url, query)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_without_since_returns_everything(self):
+        body = self.sync()
+        self.assertEqual(len(body['team_members']), 2)
+        self.assertEqual([p['name'] for p in body['projects']], ['Household Survey'])
+        self.assertEqual([r['id'] for r in body['ratings']], [self.rating.pk])
+        member = next(m for m in body['team_members'] if m['id'] == self.member.pk)
+        self.assertEqual(member['assigned_projects'], ['Household Survey'])
+
+    def test_only_rows_changed_after_cursor(self):
+        cursor = self.sync()['cursor']
+        self.assertEqual(self.sync(cursor)['team_members'], [])
+
+        self.member.name = 'Renamed'
+        self.member.save()
+        body = self.sync(cursor)
+        self.assertEqual([m['name'] for m in body['team_members']], ['Renamed'])
+        self.assertEqual(body['projects'], [])
+        self.assertEqual(body['ratings'], [])
+
+    def test_member_destroy_leaves_tombstones(self):
+        cursor = self.sync()['cursor']
+        self.client.delete(reverse('teammember-detail', args=[self.other.pk]))
+
+        deleted = self.sync(cursor)['deleted']
+        self.assertEqual(deleted['team_members'], [self.other.pk])
+        self.assertEqual(deleted['ratings'], [self.rating.pk])
+        self.assertEqual(deleted['projects'], [])
+
+    def test_project_delete_leaves_tombstones(self):
+        cursor = self.sync()['cursor']
+        self.client.delete(reverse('assign_project'), {'project_name': 'Household Survey'},
+                           content_type='application/json')
+
+        body = self.sync(cursor)
+        self.assertEqual(body['deleted']['projects'], [self.project.pk])
+        self.assertEqual(body['deleted']['ratings'], [self.rating.pk])
+        # The released member changed too, and so did the rating
+        # aggregates of the member who lost a rating.
+        self.assertEqual(sorted(m['id'] for m in body['team_members']), [self.member.pk, self.other.pk])
+        other = next(m for m in body['team_members'] if m['id'] == self.other.pk)
+        self.assertEqual(other['rating_count'], 0)
+
+    def test_rating_delete_leaves_tombstone(self):
+        cursor = self.sync()['cursor']
+        rating_id = self.rating.pk
+        self.rating.delete()
+        self.assertEqual(self.sync(cursor)['deleted']['ratings'], [rating_id])
+        self.assertEqual(DeletionLog.objects.count(), 1)
+
+    def test_queryset_deletes_leave_tombstones(self):
+        cursor = self.sync()['cursor']
+        TeamMember.objects.filter(pk=self.other.pk).delete()
+        Project.objects.all().delete()
+
+        deleted = self.sync(cursor)['deleted']
+        self.assertEqual(deleted['team_members'], [self.other.pk])
+        self.assertEqual(deleted['projects'], [self.project.pk])
+        self.assertEqual(deleted['ratings'], [self.rating.pk])
+
+    def test_cascaded_tombstones_are_written_in_one_insert(self):
+        projects = Project.objects.bulk_create([Project(name=f'Wave {i:03d}') for i in range(120)])
+        ratings = Ratings.objects.bulk_create([
+            Ratings(team_member=self.other, project=project, rating=4) for project in projects
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            TeamMember.objects.filter(pk=self.other.pk).delete()
+
+        tombstones = [q for q in queries.captured_queries if 'deletionlog' in q['sql'].lower()]
+        self.assertEqual(len(tombstones), 2)  # the member's, and one for all its ratings
+        self.assertEqual(
+            set(DeletionLog.objects.filter(model='ratings').values_list('object_id', flat=True)),
+            {rating.pk for rating in ratings} | {self.rating.pk},
+        )
+
+    def test_member_destroy_query_count_does_not_grow_with_ratings(self):
+        def destroy_queries(member, project_count):
+            projects = Project.objects.bulk_create([
+                Project(name=f'{member.ve_code} {i:03d}') for i in range(project_count)
+            ])
+            Ratings.objects.bulk_create([Ratings(team_member=member, project=p, rating=3) for p in projects])
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.delete(reverse('teammember-detail', args=[member.pk]))
+            self.assertEqual(response.status_code, 204)
+            return len(queries)
+
+        few, many = make_members(2, prefix='DEL')
+        self.assertEqual(destroy_queries(few, 2), destroy_queries(many, 250))
+        self.assertEqual(DeletionLog.objects.filter(model='ratings').count(), 252)
+
+    @override_settings(SYNC_CURSOR_MARGIN_SECONDS=30)
+    def test_cursor_leaves_a_margin_for_late_commits(self):
+        before = timezone.now()
+        body = self.sync()
+        cursor = parse_datetime(body['cursor'])
+        self.assertLessEqual(cursor, timezone.now() - timedelta(seconds=30))
+        self.assertGreaterEqual(cursor, before - timedelta(seconds=30))
+
+        # A row stamped just before the cursor was handed out but
+        # committed afterwards is still picked up.
+        TeamMember.objects.filter(pk=self.member.pk).update(name='Late', updated_at=before - timedelta(seconds=5))
+        self.assertIn('Late', [m['name'] for m in self.sync(body['cursor'])['team_members']])
+
+    def test_bad_since_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': '2025-02-30'}).status_code, 400)
+
+    def test_pages_by_limit(self):
+        make_members(5, prefix='PG')
+        first = self.client.get(self.url, {'limit': 3}).json()
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['team_members']), 3)
+
+        # A member sent on the first page changes while paging: it moves
+        # past the last row sent and comes round again.
+        TeamMember.objects.filter(pk=first['team_members'][0]['id']).update(name='Moved', updated_at=timezone.now())
+
+        pages, query = [first], {'page': first['next'], 'limit': 3}
+        while pages[-1]['has_more']:
+            pages.append(self.client.get(self.url, query).json())
+            query['page'] = pages[-1]['next']
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[-1]['next'])
+        self.assertEqual({page['cursor'] for page in pages}, {first['cursor']})
+
+        sent = [m['id'] for page in pages for m in page['team_members']]
+        self.assertEqual(len(sent), 8)
+        self.assertEqual(set(sent), set(TeamMember.objects.values_list('pk', flat=True)))
+        self.assertEqual(pages[-1]['team_members'][-1]['name'], 'Moved')
+        self.assertEqual([r['id'] for page in pages for r in page['ratings']], [self.rating.pk])
+
+    def test_pages_tombstones(self):
+        cursor = self.sync()['cursor']
+        for member in make_members(3, prefix='GONE'):
+            member.delete()
+
+        first = self.client.get(self.url, {'since': cursor, 'limit': 2}).json()
+        self.assertTrue(first['has_more'])
+        second = self.client.get(self.url, {'page': first['next'], 'limit': 2}).json()
+        self.assertFalse(second['has_more'])
+        self.assertEqual(second['since'], first['since'])
+        self.assertEqual(
+            first['deleted']['team_members'] + second['deleted']['team_members'],
+            list(DeletionLog.objects.order_by('deleted_at', 'id').values_list('object_id', flat=True)),
+        )
+
+    def test_bad_page_or_limit_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'page': 'forged'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': 0}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': 100000}).status_code, 400)
+
+
+class ReadReplicaRouterTests(TestCase):
+    router = ReadReplicaRouter()
+
+    @override_settings(DATABASE_REPLICA_ALIAS='replica')
+    def test_reads_go_to_replica_only_inside_read_only_views(self):
+        self.assertIsNone(self.router.db_for_read(TeamMember))
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(TeamMember), 'replica')
+            self.assertEqual(self.router.db_for_write(TeamMember), 'default')
+        self.assertIsNone(self.router.db_for_read(TeamMember))
+        self.assertFalse(self.router.allow_migrate('replica', 'datacollectors_app'))
+        self.assertTrue(self.router.allow_migrate('default', 'datacollectors_app'))
+
+    @override_settings(DATABASE_REPLICA_ALIAS='replica')
+    def test_cached_views_render_from_primary(self):
+        # A lagging replica read must not be cached under a new version.
+        make_members(3, prefix='DC')
+        for url in (reverse('teammember-list'), reverse('assign_project'), reverse('project-list')):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['X-Cache'], 'MISS')
+
+    @override_settings(DATABASE_REPLICA_ALIAS=None)
+    def test_no_replica_configured(self):
+        with use_replica():
+            self.assertIsNone(self.router.db_for_read(TeamMember))
+
+    @override_settings(DATABASE_REPLICA_ALIAS='replica')
+    def test_views_are_routed(self):
+        # No 'replica' connection exists here, so a routed read fails fast.
+        member, *_ = make_members(3, prefix='DC')
+        make_members(1, prefix='SUP', role='supervisor')
+        for url in (reverse('teammember-detail', args=[member.pk]), reverse('rate'), reverse('sync')):
+            with self.subTest(url=url), self.assertRaises(ConnectionDoesNotExist):
+                self.client.get(url)
+
+        # Streamed bodies read while they are consumed, after the view.
+        response = self.client.get(reverse('teammember-list'), {'stream': 'ndjson'})
+        with self.assertRaises(ConnectionDoesNotExist):
+            b''.join(response.streaming_content)
+
+        response = self.client.post(reverse('assign_project'), assignment_payload('Census', 2, 1),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.member, self.idle = make_members(2, prefix='DC')
+        make_members(1, prefix='SUP', role='supervisor')
+        self.project = Project.objects.create(name='Household Survey')
+        attach(self.project, [self.member])
+        Ratings.objects.create(team_member=self.member, project=self.project, rating=4)
+
+    async def test_member_list_matches_sync_view(self):
+        response = await self.async_client.get(reverse('async_teammember_list'))
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['count'], 3)
+
+        sync_body = await sync_to_async(self.client.get)(reverse('teammember-list'))
+        self.assertEqual(body['data'], sync_body.json()['data'])
+
+        unassigned = (await self.async_client.get(reverse('async_teammember_list'), {'unassigned': 'true'})).json()
+        self.assertEqual(unassigned['count'], 2)
+        self.assertNotIn(self.member.pk, [m['id'] for m in unassigned['data']])
+
+    async def test_member_detail(self):
+        response = await self.async_client.get(reverse('async_teammember_detail', args=[self.member.pk]))
+        self.assertEqual(response.json()['data']['assigned_projects'], ['Household Survey'])
+
+        missing = await self.async_client.get(reverse('async_teammember_detail', args=[999999]))
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_dashboard_with_summary(self):
+        body = (await self.async_client.get(reverse('async_assign_project'))).json()
+        sync_body = (await sync_to_async(self.client.get)(reverse('assign_project'))).json()
+        self.assertEqual(body['active_projects'], sync_body['active_projects'])
+        self.assertEqual(body['summary']['members_by_role'], {
+            'data_collector': {'available': 2}, 'supervisor': {'available': 1},
+        })
+        self.assertEqual(body['summary']['ratings'], {'count': 1, 'average': 4.0})
+
+    async def test_only_get_is_allowed(self):
+        response = await self.async_client.post(reverse('async_teammember_list'))
+        self.assertEqual(response.status_code, 405)
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    def test_reports_throughput_per_target(self):
+        make_members(3)
+        out = StringIO()
+        call_command(
+            'loadtest', f'wsgi={self.live_server_url}/api/teammembers/',
+            '--requests', '10', '--concurrency', '2', stdout=out,
+        )
+        line = out.getvalue().splitlines()[1].split()
+        self.assertEqual(line[0], 'wsgi')
+        self.assertGreater(float(line[1]), 0)
+        self.assertEqual(line[-1], '0')
+
+    def test_unreachable_target_fails(self):
+        with self.assertRaises(CommandError):
+            call_command('loadtest', f'{self.live_server_url}/missing/', '--requests', '1', stdout=StringIO())
+
+
+class RotationQueueTests(TestCase):
+    url = reverse('assign_project')
+
+    def allocate(self, name, num_collectors):
+        body = self.client.post(self.url, assignment_payload(name, num_collectors=num_collectors),
+                                content_type='application/json').json()
+        self.client.delete(self.url, {'project_name': name}, content_type='application/json')
+        return [m['name'] for m in body['assigned_collectors']]
+
+    def test_deployment_moves_members_to_back_of_queue(self):
+        make_members(2, prefix='FAVOURITE', rotation_rank=1)
+        make_members(2, prefix='OTHER', rotation_rank=9)
+
+        first = self.allocate('First', 2)
+        second = self.allocate('Second', 2)
+
+        self.assertTrue(all(name.startswith('FAVOURITE') for name in first))
+        # Released and available again, but behind everyone not yet deployed.
+        self.assertTrue(all(name.startswith('OTHER') for name in second))
+        self.assertEqual(self.allocate('Third', 2), first)
+
+        seqs = dict(TeamMember.objects.values_list('name', 'rotation_seq'))
+        self.assertEqual(sorted(set(seqs.values())), [2, 3])
+
+    def test_rotation_seq_is_not_writable(self):
+        member, = make_members(1)
+        self.client.put(reverse('teammember-detail', args=[member.pk]), {'rotation_seq': 99},
+                        content_type='application/json')
+        member.refresh_from_db()
+        self.assertEqual(member.rotation_seq, 0)
+
+
+class RequestInstrumentationTests(TestCase):
+    logger = 'datacollectors.instrumentation'
+
+    def test_server_timing_counts_queries(self):
+        make_members(3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('teammember-list'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="%d queries", app;dur=[\d.]+, total;dur=[\d.]+$' % len(queries))
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_as_json(self):
+        with self.assertLogs(self.logger, 'WARNING') as logs:
+            self.client.get(reverse('teammember-list'))
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['event'], 'slow_request')
+        self.assertEqual((line['method'], line['path'], line['status']), ('GET', '/api/teammembers/', 200))
+
+    def test_repeated_selects_are_flagged(self):
+        members = make_members(6)
+
+        def n_plus_one(request):
+            for member in members:
+                TeamMember.objects.filter(pk=member.pk).exists()
+            return HttpResponse()
+
+        middleware = RequestInstrumentationMiddleware(n_plus_one)
+        with self.assertLogs(self.logger, 'WARNING') as logs:
+            middleware(RequestFactory().get('/'))
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['event'], 'duplicate_queries')
+        self.assertEqual(line['duplicates'][0]['count'], 6)
+
+    @override_settings(DEBUG=True)  # adaptations are only logged in debug mode
+    def test_async_stack_is_not_adapted_to_sync(self):
+        handler = BaseHandler()
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            handler.load_middleware(is_async=True)
+        self.assertTrue(iscoroutinefunction(handler._middleware_chain))
+
+    async def test_async_views_are_instrumented(self):
+        await sync_to_async(make_members)(3)
+        response = await self.async_client.get(reverse('async_teammember_list'))
+        self.assertEqual(response.status_code, 200)
+        queries = int(re.search(r'desc="(\d+) queries"', response['Server-Timing']).group(1))
+        self.assertGreater(queries, 0)
+
+    def test_sql_signature_folds_literals_and_lists(self):
+        self.assertEqual(
+            sql_signature("SELECT * FROM t WHERE id IN (%s, %s,%s) AND name = 'x''y' LIMIT 21"),
+            sql_signature("SELECT *  FROM t WHERE id IN (%s) AND name = 'z' LIMIT 1"),
+        )
+
+
+@skipUnless(find_spec('prometheus_client'), "prometheus_client is not installed")
+class MetricsTests(TestCase):
+    def sample(self, name, **labels):
+        from prometheus_client import REGISTRY
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_exposes_member_counts_by_status_and_role(self):
+        make_members(3)
+        make_members(1, prefix='SUP', role='supervisor', status='deployed')
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('datacollectors_members{role="data_collector",status="available"} 3.0', body)
+        self.assertIn('datacollectors_members{role="supervisor",status="deployed"} 1.0', body)
+        self.assertIn('datacollectors_request_duration_seconds_bucket', body)
+
+    def test_records_request_latency_queries_and_cache_results(self):
+        view = {'view': 'teammember-list'}
+        requests = self.sample('datacollectors_request_duration_seconds_count', method='GET', status='200', **view)
+        queries = self.sample('datacollectors_request_queries_sum', **view)
+        hits = self.sample('datacollectors_response_cache_requests_total', result='hit')
+
+        self.client.get(reverse('teammember-list'))
+        self.client.get(reverse('teammember-list'))
+
+        self.assertEqual(
+            self.sample('datacollectors_request_duration_seconds_count', method='GET', status='200', **view),
+            requests + 2,
+        )
+        self.assertGreater(self.sample('datacollectors_request_queries_sum', **view), queries)
+        self.assertEqual(self.sample('datacollectors_response_cache_requests_total', result='hit'), hits + 1)
+
+    def test_records_allocation_size_and_shortfall(self):
+        make_members(3)
+        shortfall = self.sample('datacollectors_allocation_shortfall_sum', role='data_collector')
+        selected = self.sample('datacollectors_allocation_members_selected_sum', role='data_collector')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('assign_project'), assignment_payload('Census', num_collectors=5),
+                             content_type='application/json')
+
+        self.assertEqual(self.sample('datacollectors_allocation_members_selected_sum', role='data_collector'), selected + 3)
+        self.assertEqual(self.sample('datacollectors_allocation_shortfall_sum', role='data_collector'), shortfall + 2)
+
+
+class SyntheticDataTests(TestCase):
+    def test_generated_data_is_consistent(self):
+        out = StringIO()
+        call_command('generate_synthetic_data', '--members', '300', '--projects', '20',
+                     '--ratings', '1000', '--batch-size', '100', stdout=out)
+        self.assertIn('Generated 300 members, 20 projects', out.getvalue())
+
+        self.assertEqual(TeamMember.objects.count(), 300)
+        self.assertEqual(Project.objects.count(), 20)
+        self.assertEqual(Ratings.objects.count(), 1000)
+
+        assignments = TeamMember.projects.through.objects.values('teammember').annotate(n=Count('pk'))
+        counts = {row['teammember']: row['n'] for row in assignments}
+        for member in TeamMember.objects.all():
+            self.assertEqual(member.projects_count, counts.get(member.pk, 0))
+            self.assertEqual(member.status == 'deployed', member.pk in counts)
+        rated = Ratings.objects.filter(team_member=OuterRef('pk')).values('team_member').annotate(n=Count('pk')).values('n')
+        self.assertFalse(TeamMember.objects.annotate(n=Subquery(rated)).exclude(rating_count=Coalesce('n', 0)).exists())
+
+    def test_same_seed_same_data(self):
+        def snapshot():
+            return (
+                list(TeamMember.objects.order_by('ve_code').values_list('ve_code', 'name', 'role', 'status')),
+                sorted(Ratings.objects.values_list('team_member__ve_code', 'project__name', 'rating')),
+            )
+
+        generate(members=20, projects=4, ratings=30, seed=7)
+        first = snapshot()
+        TeamMember.objects.all().delete()
+        Project.objects.all().delete()
+        generate(members=20, projects=4, ratings=30, seed=7)
+        self.assertEqual(snapshot(), first)
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_every_endpoint_is_measured(self):
+        generate(members=200, projects=10, ratings=300, seed=3)
+        make_members(5, prefix='SUP', role='supervisor')
+
+        results = run_suite(repeat=2)
+
+        self.assertEqual(
+            set(results),
+            {'teammember_list_page', 'teammember_list_full', 'teammember_retrieve', 'dashboard_page',
+             'project_list_page', 'rating_list_page', 'rating_summary', 'assign_project', 'delete_project',
+             'rating_create', 'rating_bulk_100'},
+        )
+        for name, result in results.items():
+            with self.subTest(name):
+                self.assertTrue(all(status < 300 for status in result['status']), result)
+                self.assertGreater(result['queries'], 0)
+                self.assertLessEqual(result['min_ms'], result['median_ms'])
+
+        slower = {name: {**result, 'median_ms': result['median_ms'] * 2} for name, result in results.items()}
+        rows = {row[0]: row for row in compare(results, slower)}
+        self.assertAlmostEqual(rows['dashboard_page'][3], 100.0)
+
+    def test_too_few_raters_is_a_command_error(self):
+        make_members(150)
+
+        with self.assertRaisesMessage(CommandError, 'need 202 members'):
+            run_suite(repeat=2)
+        self.assertEqual(set(run_suite(repeat=2, only=['rating_create'])), {'rating_create'})
+
+
+class StaffingAnnotationTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.full = Project.objects.create(name='Full', status='active', num_collectors_needed=2, num_supervisors_needed=1)
+        self.short = Project.objects.create(name='Short', status='completed', num_collectors_needed=3)
+        collectors = make_members(3)
+        supervisor, = make_members(1, prefix='SUP', role='supervisor')
+        attach(self.full, collectors[:2] + [supervisor])
+        attach(self.short, collectors[:1])
+
+    def test_project_staffing_in_one_query(self):
+        with self.assertNumQueries(1):
+            projects = {p.name: p for p in Project.objects.with_staffing()}
+            self.assertEqual(projects['Full'].assigned_members_count, 3)
+            self.assertEqual(projects['Full'].collectors_assigned, 2)
+            self.assertEqual(projects['Full'].supervisors_assigned, 1)
+            self.assertTrue(projects['Full'].is_fully_staffed)
+            self.assertEqual(projects['Short'].assigned_members_count, 1)
+            self.assertFalse(projects['Short'].is_fully_staffed)
+
+        self.assertEqual(list(Project.objects.with_staffing().filter(fully_staffed=True)), [self.full])
+
+    def test_properties_still_work_without_annotations(self):
+        project = Project.objects.get(name='Full')
+        with self.assertNumQueries(1):
+            self.assertTrue(project.is_fully_staffed)
+
+    def test_member_assignment_stats(self):
+        with self.assertNumQueries(2):
+            members = {m.ve_code: m for m in TeamMember.objects.with_assignment_stats()}
+            first = members['M00000']
+            self.assertEqual(first.projects_assigned, 2)
+            self.assertEqual(sorted(first.assigned_projects), ['Full', 'Short'])
+            self.assertEqual(first.current_project_count, 1)
+            self.assertEqual(members['M00002'].assigned_projects, [])
+            self.assertEqual(members['M00002'].current_project_count, 0)
+
+        plain = TeamMember.objects.get(ve_code='M00000')
+        self.assertEqual(plain.assigned_projects, list(
+            TeamMember.objects.with_assignment_stats().get(pk=plain.pk).assigned_projects
+        ))
+
+
+class ProjectViewSetTests(TestCase):
+    url = reverse('project-list')
+
+    def setUp(self):
+        super().setUp()
+        collectors = make_members(4)
+        supervisor, = make_members(1, prefix='SUP', role='supervisor')
+        # bulk_create, like the other helpers, so no data-version bump is
+        # left pending in the never-committed test transaction.
+        self.census, self.survey, self.pilot = Project.objects.bulk_create([
+            Project(name='Census', status='active', start_date=date(2025, 1, 1), end_date=date(2025, 3, 31),
+                    num_collectors_needed=2, num_supervisors_needed=1),
+            Project(name='Survey', status='completed', start_date=date(2024, 6, 1), end_date=date(2024, 8, 31),
+                    num_collectors_needed=5, created_at=timezone.now() - timedelta(days=1)),
+            Project(name='Pilot', status='planning', num_collectors_needed=2,
+                    created_at=timezone.now() - timedelta(days=2)),
+        ])
+        attach(self.census, collectors[:2] + [supervisor])
+        attach(self.survey, collectors[2:])
+
+    def names(self, query=''):
+        response = self.client.get(f'{self.url}?{query}')
+        self.assertEqual(response.status_code, 200)
+        return sorted(project['name'] for project in response.json()['data'])
+
+    def test_list_has_staffing_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            body = self.client.get(self.url).json()
+        census = next(p for p in body['data'] if p['name'] == 'Census')
+        self.assertEqual(
+            (census['members_assigned'], census['collectors_assigned'], census['supervisors_assigned']),
+            (3, 2, 1),
+        )
+        self.assertTrue(census['is_fully_staffed'])
+        self.assertEqual(census['duration_days'], 89)
+        self.assertIsNone(body['next'])
+
+    def test_filters(self):
+        self.assertEqual(self.names('status=active,planning'), ['Census', 'Pilot'])
+        self.assertEqual(self.names('is_fully_staffed=false'), ['Pilot', 'Survey'])
+        self.assertEqual(self.names('is_fully_staffed=true'), ['Census'])
+        # Survey ended before the window; Pilot has no dates so it is open-ended.
+        self.assertEqual(self.names('start_date=2025-02-01'), ['Census', 'Pilot'])
+        self.assertEqual(self.names('start_date=2024-07-01&end_date=2024-12-31'), ['Pilot', 'Survey'])
+        self.assertEqual(self.client.get(f'{self.url}?start_date=soon').status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}?start_date=2025-02-30').status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}?is_fully_staffed=maybe').status_code, 400)
+
+    def test_keyset_pagination_on_created_at(self):
+        seen = []
+        body = self.client.get(f'{self.url}?page_size=2').json()
+        while True:
+            seen.extend(project['id'] for project in body['data'])
+            if not body['next']:
+                break
+            body = self.client.get(body['next']).json()
+        self.assertEqual(seen, list(Project.objects.order_by('-created_at').values_list('id', flat=True)))
+
+    def test_retrieve_and_read_only(self):
+        response = self.client.get(reverse('project-detail', args=[self.survey.pk]))
+        self.assertEqual(response.json()['data']['members_assigned'], 2)
+        self.assertFalse(response.json()['data']['is_fully_staffed'])
+        self.assertEqual(self.client.get(reverse('project-detail', args=[999999])).status_code, 404)
+        self.assertEqual(self.client.delete(reverse('project-detail', args=[self.survey.pk])).status_code, 405)
+
+    def test_staffing_follows_assignments(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('assign_project'), {'project_name': 'Census'}, content_type='application/json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Census', [p['name'] for p in response.json()['data']])
+
+
+class AllocationQueryPlanTests(TestCase):
+    def test_top_n_pick_walks_rotation_index(self):
+        make_members(50)
+        make_members(50, prefix='BUSY', status='deployed')
+        make_members(10, prefix='SUP', role='supervisor')
+        project = Project.objects.create(name='Survey')
+
+        for role in ('data_collector', 'supervisor'):
+            plan = locked_picks(project, 10, role=role).explain()
+
+            self.assertIn('teammember_role_rotation_idx', plan)
+            if connection.vendor == 'sqlite':
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_select_members_reads_only_the_quota(self):
+        make_members(200)
+        make_members(20, prefix='SUP', role='supervisor')
+        project = Project.objects.create(name='Survey')
+
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            collectors, supervisors = select_members(project, 3, 2)
+
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual((len(collectors), len(supervisors)), (3, 2))
+        self.assertEqual(len(selects), 2)
+        self.assertTrue(all('LIMIT' in sql for sql in selects), selects)
+
+
+@tag('benchmark')
+class AssignProjectBenchmarkTests(TestCase):
+    def assignment_queries(self, project_name, num_collectors):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('assign_project'),
+                assignment_payload(project_name, num_collectors=num_collectors, num_supervisors=num_collectors // 10 + 1),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_round_trips_stay_flat_as_num_collectors_grows(self):
+        make_members(700)
+        make_members(50, prefix='SUP', role='supervisor')
+        counts = {
+            num_collectors: self.assignment_queries(f'Survey {num_collectors}', num_collectors)
+            for num_collectors in (5, 50, 300)
+        }
+        self.assertEqual(len(set(counts.values())), 1, counts)
+
+
+@tag('benchmark')
+class RotationFairnessBenchmarkTests(TestCase):
+    allocations = 300
+
+    def simulate(self, label):
+        members = list(TeamMember.objects.order_by('pk'))
+        rng = random.Random(2)
+        deployments = Counter()
+        live = []
+        started = time.perf_counter()
+        for i in range(self.allocations):
+            with transaction.atomic():
+                project = Project.objects.create(name=f'{label} {i:05d}')
+                collectors, _ = select_members(project, rng.randint(5, 20), 0)
+                assign_members(project, collectors)
+            deployments.update(member.pk for member in collectors)
+            live.append(project)
+            # Keep a few projects running so the available pool churns.
+            if len(live) > 3:
+                finished = live.pop(0)
+                with transaction.atomic():
+                    release_members(finished)
+                    finished.delete()
+        elapsed = time.perf_counter() - started
+        for finished in live:
+            with transaction.atomic():
+                release_members(finished)
+                finished.delete()
+
+        counts = [deployments[member.pk] for member in members]
+        print(
+            f"\n{label}: {self.allocations} allocations, {elapsed / self.allocations * 1000:.2f} ms each, "
+            f"deployments per member min {min(counts)} max {max(counts)} stdev {statistics.pstdev(counts):.2f}"
+        )
+        return counts
+
+    def test_rotation_queue_spreads_deployments_evenly(self):
+        members = make_members(100)
+        for member, rank in zip(members, random.Random(1).choices(range(1, 11), k=len(members))):
+            member.rotation_rank = rank
+        TeamMember.objects.bulk_update(members, ['rotation_rank'])
+
+        with mock.patch('datacollectors_app.allocation.ROTATION_ORDER', ('rotation_rank', '-performance_score')):
+            by_rank = self.simulate('rank order')
+        TeamMember.objects.update(rotation_seq=0)
+        by_queue = self.simulate('rotation queue')
+
+        mean = statistics.mean(by_queue)
+        self.assertEqual(min(by_rank), 0)
+        self.assertGreater(min(by_queue), 0)
+        self.assertLess(max(by_queue) - min(by_queue), mean * 0.25)
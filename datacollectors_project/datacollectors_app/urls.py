@@ -2,14 +2,22 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TeamMemberViewSet, AssignProjectView,RatingView
+from . import async_views
+from .views import TeamMemberViewSet, ProjectViewSet, AssignProjectView,RatingView,RatingBulkView,AssignmentExportView,SyncView
 
 router = DefaultRouter()
 router.register(r'teammembers', TeamMemberViewSet)
+router.register(r'projects', ProjectViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
     path('assign-project/', AssignProjectView.as_view(), name='assign_project'),
-    path('rating/',RatingView.as_view(), name ='rate' )
+    path('rating/',RatingView.as_view(), name ='rate' ),
+    path('rating/bulk/', RatingBulkView.as_view(), name='rate_bulk'),
+    path('export/assignments/', AssignmentExportView.as_view(), name='export_assignments'),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('async/teammembers/', async_views.team_member_list, name='async_teammember_list'),
+    path('async/teammembers/<int:pk>/', async_views.team_member_detail, name='async_teammember_detail'),
+    path('async/assign-project/', async_views.project_dashboard, name='async_assign_project'),
     
 ]
@@ -1,7 +1,30 @@
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Prefetch, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.utils import encoders
 from rest_framework.response import Response
-from .models import TeamMember,Ratings
-from .serializers import TeamMemberSerializer,RatingsSerializer
+from .models import TeamMember,Project,Ratings,DeletionLog,IdempotencyKey
+from .serializers import TeamMemberSerializer,TeamMemberReadSerializer,ProjectSerializer,ProjectStaffingSerializer,RatingsSerializer,RatingBulkRowSerializer
+from . import exports, metrics, roster
+from .allocation import (
+    select_members, assign_members, preview_members, store_preview,
+    load_preview, discard_preview, lock_previewed_members, release_members,
+)
+from .caching import bump_data_version_on_commit, cached_response, conditional_response
+from .pagination import TeamMemberCursorPagination, ProjectCursorPagination, ProjectListPagination, RatingCursorPagination
+from .routers import read_only, replica_stream
 from rest_framework.views import APIView
 import random
 from rest_framework import generics
@@ -10,7 +33,27 @@ from rest_framework import generics
 class TeamMemberViewSet(viewsets.ModelViewSet):
     queryset = TeamMember.objects.all()
     serializer_class = TeamMemberSerializer
+    read_serializer_class = TeamMemberReadSerializer
+    pagination_class = TeamMemberCursorPagination
+    stream_chunk_size = 2000
+    stream_content_types = {
+        'ndjson': 'application/x-ndjson',
+        'json': 'application/json',
+    }
+
+    def get_queryset(self):
+        # Only the project names are shown, so prefetch just those columns
+        # in a single extra query for the whole page of members.
+        return super().get_queryset().prefetch_related(
+            Prefetch('projects', queryset=Project.objects.only('id', 'name'))
+        )
+
+    def get_read_serializer(self, *args, **kwargs):
+        kwargs.setdefault('context', self.get_serializer_context())
+        return self.read_serializer_class(*args, **kwargs)
 
+    @read_only
+    @cached_response
     def list(self, request):
         queryset = self.get_queryset()
 
@@ -23,23 +66,112 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
         if unassigned == 'true':
             queryset = queryset.filter(projects__isnull=True)
 
-        queryset = queryset.prefetch_related('projects')
-        
-        serializer = self.get_serializer(queryset, many=True)
-        
-        data = []
-        for item in serializer.data:
-            member = queryset.get(id=item['id'])
-            assigned_projects = [p.name for p in member.projects.all()]
-            
-            item['assigned_projects'] = assigned_projects
-            item['current_project'] = assigned_projects[0] if assigned_projects else None
-            item['assigned_projects_count'] = len(assigned_projects)
-            data.append(item)
-        
+        stream_format = request.query_params.get('stream')
+        if stream_format:
+            if stream_format not in self.stream_content_types:
+                return Response({
+                    "message": f"Unsupported stream format '{stream_format}'. Use 'ndjson' or 'json'."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            return self.stream_members(queryset, stream_format)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_read_serializer(page, many=True)
+            return Response({
+                "message": "Filtered team members retrieved successfully.",
+                "data": serializer.data,
+                "next": self.paginator.get_next_link(),
+                "previous": self.paginator.get_previous_link()
+            }, status=status.HTTP_200_OK)
+
+        serializer = self.get_read_serializer(queryset, many=True)
+
         return Response({
             "message": "Filtered team members retrieved successfully.",
-            "data": data
+            "data": serializer.data
+        }, status=status.HTTP_200_OK)
+
+    def stream_members(self, queryset, stream_format):
+        """
+        Stream every member as NDJSON or as a chunked JSON array.
+
+        Members are read in keyset-paged chunks of ``stream_chunk_size``
+        on ``(name, id)``, each chunk with its own prefetch query, so a full
+        export runs in constant memory whatever the database driver
+        (``iterator()`` would not guarantee that: mysqlclient buffers whole
+        result sets client-side). The reads happen while the body is sent,
+        on the replica if there is one.
+        """
+        serializer = self.get_read_serializer()
+        members = self.member_chunks(queryset)
+
+        def dumps(member):
+            return json.dumps(serializer.to_representation(member), cls=encoders.JSONEncoder)
+
+        def ndjson():
+            for member in members:
+                yield dumps(member) + '\n'
+
+        def json_array():
+            yield '{"message": "Filtered team members retrieved successfully.", "data": ['
+            separator = ''
+            for member in members:
+                yield separator + dumps(member)
+                separator = ','
+            yield ']}'
+
+        body = ndjson() if stream_format == 'ndjson' else json_array()
+        return StreamingHttpResponse(replica_stream(body), content_type=self.stream_content_types[stream_format])
+
+    def member_chunks(self, queryset):
+        """Yield the members in ``(name, id)`` order, one LIMITed query per chunk."""
+        queryset = queryset.order_by('name', 'id')
+        chunk = list(queryset[:self.stream_chunk_size])
+        while chunk:
+            yield from chunk
+            if len(chunk) < self.stream_chunk_size:
+                return
+            last = chunk[-1]
+            after = Q(name__gt=last.name) | Q(name=last.name, id__gt=last.id)
+            chunk = list(queryset.filter(after)[:self.stream_chunk_size])
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_roster(self, request):
+        """
+        Upsert team members from an uploaded CSV or XLSX roster (form field
+        ``file``), keyed on ``ve_code``. The format follows the file
+        extension unless ``file_format`` is given.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({
+                "message": "Upload a roster file in the 'file' field.",
+                "error": "missing_file"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('file_format') or roster.guess_format(upload.name)
+        if file_format not in roster.FORMATS:
+            return Response({
+                "message": f"Unsupported file format '{file_format}'. Use 'csv' or 'xlsx'.",
+                "error": "unsupported_format"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            report = roster.import_roster(upload, file_format)
+        except ImportError as exc:
+            return Response({
+                "message": str(exc),
+                "error": "unsupported_format"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except roster.InvalidRosterFile as exc:
+            return Response({
+                "message": str(exc),
+                "error": "invalid_file"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "message": f"{report['created']} team members created, {report['updated']} updated, {report['failed']} failed.",
+            "data": report
         }, status=status.HTTP_200_OK)
 
     def create(self, request):
@@ -55,21 +187,18 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
             "errors": serializer.errors
         }, status=status.HTTP_400_BAD_REQUEST)
 
+    # Rating changes move the member's updated_at along with its stored
+    # aggregates (see TeamMemberQuerySet.refresh_rating_stats).
+    @read_only
+    @conditional_response('updated_at', 'projects__updated_at')
     def retrieve(self, request, pk=None):
         try:
             instance = self.get_object()
-            serializer = self.get_serializer(instance)
-            
-            # Add project information
-            data = serializer.data
-            assigned_projects = [p.name for p in instance.projects.all()]
-            data['assigned_projects'] = assigned_projects
-            data['current_project'] = assigned_projects[0] if assigned_projects else None
-            data['assigned_projects_count'] = len(assigned_projects)
-            
+            serializer = self.get_read_serializer(instance)
+
             return Response({
                 "message": "Team member details retrieved.",
-                "data": data
+                "data": serializer.data
             }, status=status.HTTP_200_OK)
         except TeamMember.DoesNotExist:
             return Response({
@@ -80,18 +209,11 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
-            
-            # Add project information to response
-            data = serializer.data
-            assigned_projects = [p.name for p in instance.projects.all()]
-            data['assigned_projects'] = assigned_projects
-            data['current_project'] = assigned_projects[0] if assigned_projects else None
-            data['assigned_projects_count'] = len(assigned_projects)
-            
+            instance = serializer.save()
+
             return Response({
                 "message": "Team member updated successfully.",
-                "data": data
+                "data": self.get_read_serializer(instance).data
             }, status=status.HTTP_200_OK)
         return Response({
             "message": "Team member update failed.",
@@ -100,21 +222,28 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
 
     def destroy(self, request, pk=None):
         instance = self.get_object()
-        instance.delete()
+        with transaction.atomic():
+            # One DELETE for the member's ratings rather than one per 100.
+            Ratings.objects.filter(team_member=instance).delete_in_bulk()
+            instance.delete()
         return Response({
             "message": "Team member deleted successfully."
         }, status=status.HTTP_204_NO_CONTENT)
 
-from rest_framework import status
-from datetime import datetime
-from .models import TeamMember, Project
 
 class AssignProjectView(APIView):
     def post(self, request):
         data = request.data
         project_name = data.get("projectName")
-        num_collectors = int(data.get("numCollectors", 0))
-        num_supervisors = int(data.get("numSupervisors", 0))
+        try:
+            num_collectors = int(data.get("numCollectors", 0))
+            num_supervisors = int(data.get("numSupervisors", 0))
+        except (TypeError, ValueError):
+            num_collectors = num_supervisors = -1
+        if num_collectors < 0 or num_supervisors < 0:
+            return Response({
+                "message": "numCollectors and numSupervisors must be whole numbers of zero or more."
+            }, status=400)
         scrum_master = data.get("name")  
         start_date = data.get("startDate")
         end_date = data.get("endDate")
@@ -141,86 +270,126 @@ class AssignProjectView(APIView):
                 "message": "Invalid date format. Please use YYYY-MM-DD."
             }, status=400)
 
-        project, created = Project.objects.get_or_create(
-            name=project_name,
-            defaults={
-                'scrum_master': scrum_master,
-                'start_date': start_date_obj,
-                'end_date': end_date_obj,
-                'num_collectors_needed': num_collectors,
-                'num_supervisors_needed': num_supervisors,
-                 'status': status 
-            }
-        )
-        
-        if not created:
-            project.scrum_master = scrum_master
-            project.start_date = start_date_obj
-            project.end_date = end_date_obj
-            project.num_collectors_needed = num_collectors
-            project.num_supervisors_needed = num_supervisors
-            project.status = status
-            project.save()
-
-        selected_members = []
-        
-        # Only proceed with member selection if num_collectors > 0
-        if num_collectors > 0:
-            available_members_query = TeamMember.objects.filter(status="available").exclude(projects=project)
-            available_members = available_members_query.order_by('rotation_rank', '-performance_score')
-            selected_members = list(available_members[:num_collectors])
-
-            # If we don't have enough available members, try to get more from other statuses
-            if len(selected_members) < num_collectors:
-                remaining_needed = num_collectors - len(selected_members)
-                
-                total_available_query = TeamMember.objects.filter(status="available")
-                total_available = total_available_query.count()
-                
-                if total_available == 0:
-                    all_eligible_query = TeamMember.objects.exclude(projects=project)
-                    all_eligible_members = all_eligible_query.order_by('rotation_rank', '-performance_score')
-                    additional_members = list(all_eligible_members[:remaining_needed])
-                    selected_members.extend(additional_members)
-                else:
-                    other_members_query = TeamMember.objects.exclude(status="available").exclude(
-                        id__in=[m.id for m in selected_members]
-                    ).exclude(projects=project)
-                    
-                    other_members = other_members_query.order_by('rotation_rank', '-performance_score')
-                    additional_members = list(other_members[:remaining_needed])
-                    selected_members.extend(additional_members)
+        # Retries carrying the same Idempotency-Key replay the stored response
+        # instead of allocating a second team.
+        idempotency_key = request.headers.get("Idempotency-Key")
+        preview_token = data.get("previewToken")
+        request_hash = hashlib.sha256(json.dumps(
+            {key: value for key, value in data.items() if key != "previewToken"},
+            sort_keys=True, default=str
+        ).encode()).hexdigest()
+
+        # Preview who would be picked without writing anything. The preview
+        # token in the response confirms exactly that team later on.
+        if request.query_params.get("dry_run") == "true":
+            project = Project.objects.filter(name=project_name).first()
+            selected_members, supervisor_members = preview_members(
+                project, num_collectors, num_supervisors
+            )
+            response_data = self.allocation_response(
+                project_name, scrum_master, start_date, end_date, duration_days,
+                status, num_collectors, num_supervisors,
+                selected_members, supervisor_members
+            )
+            response_data["message"] = f"Preview: {len(selected_members)} data collectors and {len(supervisor_members)} supervisors would be assigned to project {project_name}."
+            response_data["dry_run"] = True
+            response_data["preview_token"] = store_preview(
+                request_hash, selected_members, supervisor_members
+            )
+            return Response(response_data, status=200)
+
+        preview = None
+        if preview_token:
+            preview = load_preview(preview_token)
+            if preview is None:
+                return Response({
+                    "message": "Preview has expired. Please run the preview again.",
+                    "error": "preview_expired"
+                }, status=409)
+            if preview["request_hash"] != request_hash:
+                return Response({
+                    "message": "Preview token does not match this request.",
+                    "error": "preview_mismatch"
+                }, status=422)
+
+        with transaction.atomic():
+            idempotency_record = None
+            if idempotency_key:
+                idempotency_record, key_created = IdempotencyKey.objects.get_or_create(
+                    key=idempotency_key,
+                    defaults={'request_hash': request_hash}
+                )
+                if not key_created:
+                    return self.replay(idempotency_record, request_hash)
+
+            project, created = Project.objects.get_or_create(
+                name=project_name,
+                defaults={
+                    'scrum_master': scrum_master,
+                    'start_date': start_date_obj,
+                    'end_date': end_date_obj,
+                    'num_collectors_needed': num_collectors,
+                    'num_supervisors_needed': num_supervisors,
+                     'status': status 
+                }
+            )
+            
+            if not created:
+                project.scrum_master = scrum_master
+                project.start_date = start_date_obj
+                project.end_date = end_date_obj
+                project.num_collectors_needed = num_collectors
+                project.num_supervisors_needed = num_supervisors
+                project.status = status
+                project.save()
 
             # Removed the condition that returns error if not enough collectors found
             # Now it will proceed with whatever members are available
+            if preview is not None:
+                team = lock_previewed_members(project, preview)
+                if team is None:
+                    transaction.set_rollback(True)
+                    return Response({
+                        "message": "Some previewed members are no longer available. Please run the preview again.",
+                        "error": "preview_stale"
+                    }, status=409)
+                selected_members, supervisor_members = team
+                transaction.on_commit(lambda: discard_preview(preview_token))
+            else:
+                selected_members, supervisor_members = select_members(
+                    project, num_collectors, num_supervisors
+                )
+            assign_members(project, selected_members + supervisor_members)
+            assigned = (len(selected_members), len(supervisor_members))
+            transaction.on_commit(lambda: metrics.observe_allocation(
+                num_collectors, assigned[0], num_supervisors, assigned[1]
+            ))
 
-            for member in selected_members:
-                member.projects.add(project)
-                member.projects_count += 1
-                member.status = "deployed"
-                member.save()
-
-        supervisor_members = []
-        if num_supervisors > 0:
-            available_supervisors_query = TeamMember.objects.filter(status="available").exclude(projects=project)
-            available_supervisors = available_supervisors_query.order_by('rotation_rank', '-performance_score')
-            supervisor_members = list(available_supervisors[:num_supervisors])
-            
-            for supervisor in supervisor_members:
-                supervisor.projects.add(project)
-                supervisor.projects_count += 1
-                supervisor.status = "deployed"
-                supervisor.save()
+            response_data = self.allocation_response(
+                project_name, scrum_master, start_date, end_date, project.duration_days,
+                project.status, num_collectors, num_supervisors,
+                selected_members, supervisor_members
+            )
 
-        return Response({
+            if idempotency_record is not None:
+                idempotency_record.response_status = 200
+                idempotency_record.response_body = response_data
+                idempotency_record.save(update_fields=['response_status', 'response_body'])
+
+        return Response(response_data, status=200)
+
+    def allocation_response(self, project_name, scrum_master, start_date, end_date,
+                            duration_days, project_status, num_collectors, num_supervisors,
+                            selected_members, supervisor_members):
+        return {
             "message": f"{len(selected_members)} data collectors and {len(supervisor_members)} supervisors assigned to project {project_name}.",
             "project_details": {
                 "name": project_name,
                 "scrum_master": scrum_master,
                 "start_date": start_date,
                 "end_date": end_date,
-                "duration_days": project.duration_days,
-                "status": project.status,
+                "duration_days": duration_days,
+                "status": project_status,
                 "num_collectors_needed": num_collectors,
                 "num_supervisors_needed": num_supervisors,
                 "num_collectors_assigned": len(selected_members),
@@ -245,57 +414,102 @@ class AssignProjectView(APIView):
                 }
                 for s in supervisor_members
             ]
-        }, status=200)
+        }
+
+    def replay(self, record, request_hash):
+        """Answer a retried request from its stored response."""
+        if record.request_hash != request_hash:
+            return Response({
+                "message": "Idempotency-Key has already been used with a different request.",
+                "error": "idempotency_key_reused"
+            }, status=422)
+        return Response(record.response_body, status=record.response_status)
 
+    @read_only
+    @cached_response
     def get(self, request):
-        projects = Project.objects.all()
-        response_data = {}
+        projects = self.dashboard_queryset(request.query_params.get('status'))
 
-        for project in projects:
-            members = project.team_members.all()
-            collectors = [m for m in members if getattr(m, 'role', None) == "data_collector"]
-            supervisors = [m for m in members if getattr(m, 'role', None) == "supervisor"]
-            
-            response_data[project.name] = {
-                "project_info": {
-                    "id":project.id,
-                    "name": project.name,
-                    "scrum_master": project.scrum_master or 'Not specified',
-                    "start_date": project.start_date.strftime('%Y-%m-%d') if project.start_date else None,
-                    "end_date": project.end_date.strftime('%Y-%m-%d') if project.end_date else None,
-                    "duration_days": project.duration_days,
-                    "status": project.status,
-                    "total_collectors": len(collectors),
-                    "total_supervisors": len(supervisors),
-                    "collectors_needed": project.num_collectors_needed,
-                    "supervisors_needed": project.num_supervisors_needed
-                },
-                "data_collectors": [
-                    {
-                        "name": m.name,
-                        "experience_level": getattr(m, 'experience_level', 'N/A'),
-                        "performance_score": m.performance_score,
-                        "rotation_rank": m.rotation_rank,
-                        "role": getattr(m, 'role', 'data_collector'),
-                        "status": m.status,
-                    }
-                    for m in collectors
-                ],
-                "supervisors": [
-                    {
-                        "name": m.name,
-                        "experience_level": getattr(m, 'experience_level', 'N/A'),
-                        "performance_score": m.performance_score,
-                        "rotation_rank": m.rotation_rank,
-                        "role": getattr(m, 'role', 'supervisor'),
-                        "status": m.status,
-                    }
-                    for m in supervisors
-                ]
-            }
+        paginator = ProjectCursorPagination()
+        page = paginator.paginate_queryset(projects, request, view=self)
+        if page is not None:
+            projects = page
+
+        response_data = {project.name: self.dashboard_entry(project) for project in projects}
+
+        if page is not None:
+            return Response({
+                "active_projects": response_data,
+                "next": paginator.get_next_link(),
+                "previous": paginator.get_previous_link()
+            }, status=200)
 
         return Response({"active_projects": response_data}, status=200)
 
+    @staticmethod
+    def dashboard_queryset(status_param=None):
+        # Members come in two prefetch queries, one per role, so the whole
+        # dashboard costs three queries however many projects it shows.
+        member_fields = ('name', 'experience_level', 'performance_score', 'rotation_rank', 'role', 'status')
+        projects = Project.objects.prefetch_related(
+            Prefetch(
+                'team_members',
+                queryset=TeamMember.objects.filter(role="data_collector").only(*member_fields),
+                to_attr='data_collectors'
+            ),
+            Prefetch(
+                'team_members',
+                queryset=TeamMember.objects.filter(role="supervisor").only(*member_fields),
+                to_attr='supervisors'
+            ),
+        )
+        if status_param:
+            projects = projects.filter(status__in=status_param.split(','))
+        return projects
+
+    @staticmethod
+    def dashboard_entry(project):
+        collectors = project.data_collectors
+        supervisors = project.supervisors
+
+        return {
+            "project_info": {
+                "id":project.id,
+                "name": project.name,
+                "scrum_master": project.scrum_master or 'Not specified',
+                "start_date": project.start_date.strftime('%Y-%m-%d') if project.start_date else None,
+                "end_date": project.end_date.strftime('%Y-%m-%d') if project.end_date else None,
+                "duration_days": project.duration_days,
+                "status": project.status,
+                "total_collectors": len(collectors),
+                "total_supervisors": len(supervisors),
+                "collectors_needed": project.num_collectors_needed,
+                "supervisors_needed": project.num_supervisors_needed
+            },
+            "data_collectors": [
+                {
+                    "name": m.name,
+                    "experience_level": getattr(m, 'experience_level', 'N/A'),
+                    "performance_score": m.performance_score,
+                    "rotation_rank": m.rotation_rank,
+                    "role": getattr(m, 'role', 'data_collector'),
+                    "status": m.status,
+                }
+                for m in collectors
+            ],
+            "supervisors": [
+                {
+                    "name": m.name,
+                    "experience_level": getattr(m, 'experience_level', 'N/A'),
+                    "performance_score": m.performance_score,
+                    "rotation_rank": m.rotation_rank,
+                    "role": getattr(m, 'role', 'supervisor'),
+                    "status": m.status,
+                }
+                for m in supervisors
+            ]
+        }
+
     def delete(self, request):
         """
         Delete a project and unassign all team members from it.
@@ -322,60 +536,40 @@ class AssignProjectView(APIView):
                 "error": "project_not_found"
             }, status=404)
         
-        # Get all team members assigned to this project
-        assigned_members = project.team_members.all()
-        member_count = assigned_members.count()
-        
         # Store member details for response
         unassigned_members = []
         members_made_available = []
         members_still_deployed = []
         
-        # Use database transaction to ensure atomicity
-        from django.db import transaction
-        
         try:
             with transaction.atomic():
-                # Unassign all team members from the project
-                for member in assigned_members:
-                    # Store current state
-                    previous_status = member.status
-                    previous_project_count = member.projects_count
-                    
+                # Unassign all team members from the project in bulk
+                members, remaining_projects = release_members(project)
+                member_count = len(members)
+
+                for member in members:
                     unassigned_members.append({
-                        "id": member.id,
-                        "name": member.name,
-                        "ve_code": getattr(member, 've_code', None),
-                        "role": getattr(member, 'role', 'Unknown'),
-                        "previous_status": previous_status,
-                        "previous_project_count": previous_project_count
+                        "id": member["id"],
+                        "name": member["name"],
+                        "ve_code": member["ve_code"],
+                        "role": member["role"],
+                        "previous_status": member["status"],
+                        "previous_project_count": member["projects_count"]
                     })
-                    
-                    # Remove project from member's assigned projects
-                    member.projects.remove(project)
-                    
-                    # Update projects count (ensure it doesn't go negative)
-                    member.projects_count = max(0, member.projects.count())
-                    
-                    # Update status based on remaining projects
-                    remaining_projects = member.projects.all()
-                    if remaining_projects.count() == 0:
-                        # No more projects - set to available
-                        member.status = "available"
+
+                    if member["id"] not in remaining_projects:
+                        # No more projects - now available
                         members_made_available.append({
-                            "name": member.name,
-                            "ve_code": getattr(member, 've_code', None)
+                            "name": member["name"],
+                            "ve_code": member["ve_code"]
                         })
                     else:
-                        # Still has other projects - keep deployed
-                        member.status = "deployed"
+                        # Still has other projects - kept deployed
                         members_still_deployed.append({
-                            "name": member.name,
-                            "ve_code": getattr(member, 've_code', None),
-                            "remaining_projects": [p.name for p in remaining_projects]
+                            "name": member["name"],
+                            "ve_code": member["ve_code"],
+                            "remaining_projects": remaining_projects[member["id"]]
                         })
-                    
-                    member.save()
                 
                 # Store project details before deletion
                 project_details = {
@@ -389,6 +583,10 @@ class AssignProjectView(APIView):
                     "supervisors_needed": getattr(project, 'num_supervisors_needed', 0)
                 }
                 
+                # The project's ratings go with it, deleted in one query
+                # with their tombstones and their members' refreshed
+                # rating aggregates.
+                Ratings.objects.filter(project=project).delete_in_bulk()
                 project.delete()
                 
                 return Response({
@@ -410,6 +608,450 @@ class AssignProjectView(APIView):
                 "error": "deletion_failed"
             }, status=500)
 
-class RatingView(generics.ListCreateAPIView):
+
+class QueryParamMixin:
+    """Typed query-parameter readers that answer bad values with a 400."""
+
+    def int_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: ["A whole number is required."]})
+
+    def datetime_param(self, name, end_of_day=False):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        # Well-formed but impossible values (2025-02-30) raise ValueError.
+        try:
+            parsed = parse_datetime(value)
+            day = parse_date(value) if parsed is None else None
+        except ValueError:
+            parsed = day = None
+        if parsed is None:
+            if day is None:
+                raise ValidationError({name: ["Use an ISO 8601 date or datetime."]})
+            parsed = datetime.combine(day, time.max if end_of_day else time.min)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def date_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: ["Use an ISO 8601 date."]})
+        return parsed
+
+    def bool_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        if value.lower() not in ('true', 'false'):
+            raise ValidationError({name: ["Use 'true' or 'false'."]})
+        return value.lower() == 'true'
+
+
+class RatingView(QueryParamMixin, generics.ListCreateAPIView):
     queryset = Ratings.objects.all()
-    serializer_class = RatingsSerializer
\ No newline at end of file
+    serializer_class = RatingsSerializer
+    pagination_class = RatingCursorPagination
+
+    def get_queryset(self):
+        """
+        Ratings narrowed by the optional query parameters ``team_member``
+        (id), ``ve_code``, ``project`` (id), ``project_name``,
+        ``min_rating``/``max_rating`` and ``created_after``/``created_before``
+        (ISO 8601 date or datetime).
+        """
+        queryset = super().get_queryset().select_related('team_member', 'project')
+        params = self.request.query_params
+
+        filters = {
+            'team_member_id': self.int_param('team_member'),
+            'team_member__ve_code': params.get('ve_code'),
+            'project_id': self.int_param('project'),
+            'project__name': params.get('project_name'),
+            'rating__gte': self.int_param('min_rating'),
+            'rating__lte': self.int_param('max_rating'),
+            'created_at__gte': self.datetime_param('created_after'),
+            'created_at__lte': self.datetime_param('created_before', end_of_day=True),
+        }
+        return queryset.filter(**{key: value for key, value in filters.items() if value is not None})
+
+    @read_only
+    @conditional_response()
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('summary') == 'true':
+            return Response(self.summary(self.filter_queryset(self.get_queryset())))
+        return super().list(request, *args, **kwargs)
+
+    def summary(self, queryset):
+        """
+        Per-project and per-member rating counts, averages and 1-5 star
+        histograms, aggregated in SQL over the filtered ratings.
+        """
+        aggregates = {
+            'count': Count('rating'),
+            'average': Avg('rating'),
+            **{f'stars_{star}': Count('pk', filter=Q(rating=star)) for star in range(1, 6)},
+        }
+        queryset = queryset.select_related(None).order_by()
+
+        def rows(group_by, order_by):
+            return [
+                {
+                    **{key: row[key] for key in group_by},
+                    'count': row['count'],
+                    'average': round(row['average'], 2) if row['average'] is not None else None,
+                    'histogram': {str(star): row[f'stars_{star}'] for star in range(1, 6)},
+                }
+                for row in queryset.values(*group_by).annotate(**aggregates).order_by(order_by)
+            ]
+
+        return {
+            "by_project": rows(('project', 'project__name'), 'project__name'),
+            "by_member": rows(('team_member', 'team_member__ve_code', 'team_member__name'), 'team_member__name'),
+        }
+
+
+class ProjectViewSet(QueryParamMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only project resource with staffing counts.
+
+    Every project carries its assigned member counts per role and
+    whether it is fully staffed, annotated in the list query itself (see
+    ``Project.objects.with_staffing``). Lists are keyset-paginated on
+    ``created_at``.
+    """
+    queryset = Project.objects.all()
+    serializer_class = ProjectStaffingSerializer
+    pagination_class = ProjectListPagination
+
+    def get_queryset(self):
+        """
+        Projects narrowed by the optional query parameters ``status``
+        (comma-separated), ``start_date``/``end_date`` (projects running
+        at any point in that window) and ``is_fully_staffed``.
+        """
+        queryset = Project.objects.with_staffing()
+        params = self.request.query_params
+
+        status_param = params.get('status')
+        if status_param:
+            queryset = queryset.filter(status__in=status_param.split(','))
+
+        window_start = self.date_param('start_date')
+        window_end = self.date_param('end_date')
+        if window_start is not None:
+            queryset = queryset.filter(Q(end_date__isnull=True) | Q(end_date__gte=window_start))
+        if window_end is not None:
+            queryset = queryset.filter(Q(start_date__isnull=True) | Q(start_date__lte=window_end))
+
+        fully_staffed = self.bool_param('is_fully_staffed')
+        if fully_staffed is not None:
+            queryset = queryset.filter(fully_staffed=fully_staffed)
+        return queryset
+
+    @read_only
+    @cached_response
+    def list(self, request):
+        page = self.paginate_queryset(self.get_queryset())
+        return Response({
+            "message": "Projects retrieved successfully.",
+            "data": self.get_serializer(page, many=True).data,
+            "next": self.paginator.get_next_link(),
+            "previous": self.paginator.get_previous_link()
+        }, status=status.HTTP_200_OK)
+
+    @read_only
+    @cached_response
+    def retrieve(self, request, pk=None):
+        return Response({
+            "message": "Project details retrieved.",
+            "data": self.get_serializer(self.get_object()).data
+        }, status=status.HTTP_200_OK)
+
+
+class SyncView(QueryParamMixin, APIView):
+    """
+    Changes since a cursor, for clients that keep a local copy.
+
+    ``GET /api/sync/?since=<ISO 8601>`` returns the team members,
+    projects and ratings updated after ``since`` and the ids of those
+    deleted since then, read from the ``updated_at`` indexes and the
+    deletion log. Without ``since`` every row is returned. Pass the
+    returned ``cursor`` as the next ``since``.
+
+    Each list holds at most ``limit`` rows (default ``default_limit``),
+    read in ``(updated_at, id)`` order. While ``has_more`` is true, fetch
+    ``?page=<next>`` to get the rest; ``next`` carries ``since``, the
+    cursor and the last row sent from each list, so every page picks up
+    where the one before stopped. Rows updated while paging move past the
+    last row sent and are picked up by a later page.
+
+    The cursor lags ``SYNC_CURSOR_MARGIN_SECONDS`` behind the current
+    time, so rows stamped before it by transactions that commit (or
+    reach the replica) after this read are still sent next time. Rows
+    changed within the margin are sent again; apply them as upserts.
+    """
+    default_limit = 1000
+    max_limit = 5000
+    page_salt = 'datacollectors_app.sync'
+
+    @read_only
+    def get(self, request):
+        limit = self.int_param('limit')
+        if limit is None:
+            limit = self.default_limit
+        elif not 1 <= limit <= self.max_limit:
+            raise ValidationError({'limit': [f"Must be between 1 and {self.max_limit}."]})
+        state = self.page_state()
+
+        since = state['since']
+        members, members_after, members_more = self.page(
+            TeamMember.objects.prefetch_related(Prefetch('projects', Project.objects.only('id', 'name'))),
+            'updated_at', since, state['after'].get('team_members'), limit,
+        )
+        projects, projects_after, projects_more = self.page(
+            Project.objects.all(), 'updated_at', since, state['after'].get('projects'), limit,
+        )
+        ratings, ratings_after, ratings_more = self.page(
+            Ratings.objects.all(), 'updated_at', since, state['after'].get('ratings'), limit,
+        )
+        deleted = {'teammember': [], 'project': [], 'ratings': []}
+        deleted_after, deleted_more = None, False
+        if since is not None:
+            tombstones, deleted_after, deleted_more = self.page(
+                DeletionLog.objects.all(), 'deleted_at', since, state['after'].get('deleted'), limit,
+            )
+            for tombstone in tombstones:
+                deleted.setdefault(tombstone.model, []).append(tombstone.object_id)
+
+        has_more = members_more or projects_more or ratings_more or deleted_more
+        after = {
+            'team_members': members_after,
+            'projects': projects_after,
+            'ratings': ratings_after,
+            'deleted': deleted_after,
+        }
+        return Response({
+            "since": since,
+            "cursor": state['cursor'],
+            "has_more": has_more,
+            "next": self.next_page(state, after) if has_more else None,
+            "team_members": TeamMemberReadSerializer(members, many=True).data,
+            "projects": ProjectSerializer(projects, many=True).data,
+            "ratings": RatingsSerializer(ratings, many=True).data,
+            "deleted": {
+                "team_members": deleted['teammember'],
+                "projects": deleted['project'],
+                "ratings": deleted['ratings'],
+            },
+        })
+
+    def page_state(self):
+        """``since``, the cursor and each list's last row sent, from ``?page=`` or a fresh start."""
+        token = self.request.query_params.get('page')
+        if token is None:
+            return {
+                'since': self.datetime_param('since'),
+                'cursor': timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_CURSOR_MARGIN_SECONDS', 60)),
+                'after': {},
+            }
+        try:
+            state = signing.loads(token, salt=self.page_salt)
+        except signing.BadSignature:
+            raise ValidationError({'page': ["Invalid page token."]})
+        return {
+            'since': parse_datetime(state['since']) if state['since'] else None,
+            'cursor': parse_datetime(state['cursor']),
+            'after': {
+                name: (parse_datetime(stamp), pk)
+                for name, (stamp, pk) in state['after'].items()
+            },
+        }
+
+    def next_page(self, state, after):
+        return signing.dumps({
+            'since': state['since'].isoformat() if state['since'] else None,
+            'cursor': state['cursor'].isoformat(),
+            'after': {
+                name: (position[0].isoformat(), position[1])
+                for name, position in after.items() if position is not None
+            },
+        }, salt=self.page_salt)
+
+    @staticmethod
+    def page(queryset, field, since, after, limit):
+        """
+        Up to ``limit`` rows changed after ``since`` and past ``after``
+        in ``(field, id)`` order, with the position of the last one and
+        whether any are left.
+        """
+        if since is not None:
+            queryset = queryset.filter(**{f'{field}__gt': since})
+        if after is not None:
+            stamp, pk = after
+            queryset = queryset.filter(Q(**{f'{field}__gt': stamp}) | Q(**{field: stamp, 'id__gt': pk}))
+        rows = list(queryset.order_by(field, 'id')[:limit + 1])
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            after = (getattr(rows[-1], field), rows[-1].pk)
+        return rows, after, more
+
+
+class RatingBulkView(APIView):
+    """
+    Create or update many ratings in one request.
+
+    Expected request body: a list of
+    ``{"team_member", "project", "rating", "feedback", "rated_by"}``
+    objects. Rows are validated in memory, members and projects are
+    looked up once for the whole batch, and the valid rows are upserted
+    on (team_member, project) with a single ``bulk_create``. The
+    response reports the outcome of every row.
+    """
+
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response({
+                "message": "Expected a list of ratings.",
+                "error": "invalid_payload"
+            }, status=400)
+
+        validated = []
+        for row in rows:
+            row_serializer = RatingBulkRowSerializer(data=row)
+            row_serializer.is_valid()
+            validated.append((row_serializer.validated_data, row_serializer.errors))
+
+        members = self.lookup(TeamMember, 've_code', [row.get('team_member') for row, _ in validated])
+        projects = self.lookup(Project, 'name', [row.get('project') for row, _ in validated])
+
+        results = []
+        ratings = []
+        seen = set()
+        for index, (row, errors) in enumerate(validated):
+            if not errors:
+                member = members.get(row['team_member'])
+                project = projects.get(row['project'])
+                if member is None:
+                    errors = {"team_member": [f"Team member '{row['team_member']}' not found."]}
+                elif project is None:
+                    errors = {"project": [f"Project '{row['project']}' not found."]}
+                elif (member.pk, project.pk) in seen:
+                    errors = {"non_field_errors": ["Duplicate rating for this team member and project."]}
+            if errors:
+                results.append({"row": index, "status": "error", "errors": errors})
+                continue
+
+            seen.add((member.pk, project.pk))
+            ratings.append(Ratings(
+                team_member=member,
+                project=project,
+                rating=row.get('rating'),
+                feedback=row.get('feedback'),
+                rated_by=row.get('rated_by'),
+            ))
+            results.append({"row": index, "status": None, "team_member": member.pk, "project": project.pk})
+
+        with transaction.atomic():
+            existing = set(
+                Ratings.objects.filter(
+                    team_member_id__in={pair[0] for pair in seen},
+                    project_id__in={pair[1] for pair in seen},
+                ).values_list('team_member_id', 'project_id')
+            ) if seen else set()
+
+            upsert = {'update_conflicts': True, 'update_fields': ['rating', 'feedback', 'rated_by', 'updated_at']}
+            if connection.features.supports_update_conflicts_with_target:
+                upsert['unique_fields'] = ['team_member', 'project']
+            Ratings.objects.bulk_create(ratings, **upsert)
+            TeamMember.objects.filter(pk__in={pair[0] for pair in seen}).refresh_rating_stats()
+            bump_data_version_on_commit()
+
+        for result in results:
+            if result["status"] is None:
+                pair = (result["team_member"], result["project"])
+                result["status"] = "updated" if pair in existing else "created"
+
+        created = sum(result["status"] == "created" for result in results)
+        updated = sum(result["status"] == "updated" for result in results)
+        return Response({
+            "message": f"{created + updated} of {len(rows)} ratings saved.",
+            "summary": {
+                "created": created,
+                "updated": updated,
+                "failed": len(rows) - created - updated
+            },
+            "results": results
+        }, status=200)
+
+    def lookup(self, model, natural_key, references):
+        """
+        Resolve ids and natural keys (ve_code / project name) to instances
+        with one query. Returns a dict keyed by the reference as sent.
+        """
+        references = {reference for reference in references if reference}
+        ids = {int(reference) for reference in references if reference.isdigit()}
+        instances = model.objects.filter(
+            Q(pk__in=ids) | Q(**{f'{natural_key}__in': references})
+        ).only('pk', natural_key)
+
+        found = {}
+        for instance in instances:
+            found[getattr(instance, natural_key)] = instance
+            found.setdefault(str(instance.pk), instance)
+        return found
+
+
+class AssignmentExportView(QueryParamMixin, APIView):
+    """
+    Stream the member-project assignment table, joined with each member's
+    rating for the project, as CSV (default) or Parquet
+    (``file_format=parquet``, needs pyarrow).
+
+    Optional filters: ``project_status`` (comma separated) and
+    ``date_from``/``date_to`` (YYYY-MM-DD), which keep projects whose
+    dates overlap that window.
+    """
+    content_types = {
+        'csv': 'text/csv',
+        'parquet': 'application/vnd.apache.parquet',
+    }
+
+    def get(self, request):
+        params = request.query_params
+        file_format = params.get('file_format', 'csv')
+        if file_format not in self.content_types:
+            return Response({
+                "message": f"Unsupported file format '{file_format}'. Use 'csv' or 'parquet'.",
+                "error": "unsupported_format"
+            }, status=400)
+        if file_format == 'parquet' and not exports.parquet_available():
+            return Response({
+                "message": "Parquet export requires the 'pyarrow' package.",
+                "error": "unsupported_format"
+            }, status=400)
+
+        project_status = params.get('project_status')
+        rows = exports.assignment_rows(
+            project_status=project_status.split(',') if project_status else None,
+            date_from=self.date_param('date_from'),
+            date_to=self.date_param('date_to'),
+        )
+        body = exports.stream_csv(rows) if file_format == 'csv' else exports.stream_parquet(rows)
+        response = StreamingHttpResponse(body, content_type=self.content_types[file_format])
+        response['Content-Disposition'] = f'attachment; filename="assignments.{file_format}"'
+        return response
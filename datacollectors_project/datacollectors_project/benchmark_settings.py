@@ -0,0 +1,18 @@
+"""
+Settings for running the endpoint benchmark suite hermetically on SQLite:
+
+    python manage.py run_benchmarks --settings=datacollectors_project.benchmark_settings
+"""
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'benchmark.sqlite3',  # noqa: F405
+    }
+}
+DATABASE_REPLICA_ALIAS = None
+
+DEBUG = False
+# Every request is timed by the suite itself.
+SLOW_REQUEST_MS = 10 ** 9
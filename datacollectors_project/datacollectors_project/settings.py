@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'datacollectors_app.middleware.RequestInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,14 +94,59 @@ WSGI_APPLICATION = 'datacollectors_project.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': 'muhumuza',
-        'USER': 'root',
-        'PASSWORD': '',
-        'HOST': '127.0.0.1',
-        # 'PORT': '5432',
+        'ENGINE': os.environ.get('DB_ENGINE', 'django.db.backends.mysql'),
+        'NAME': os.environ.get('DB_NAME', 'muhumuza'),
+        'USER': os.environ.get('DB_USER', 'root'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('DB_PORT', ''),
+        # Keep connections open between requests instead of reconnecting
+        # every time; health checks drop ones the server has closed.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
 
+# PostgreSQL can pool connections inside the process (psycopg 3).
+if os.environ.get('DB_POOL') and 'postgresql' in DATABASES['default']['ENGINE']:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {'pool': True}
+
+# Optional read replica: set DB_REPLICA_HOST (and DB_REPLICA_NAME etc.
+# where they differ from the primary). Read-only views marked with
+# routers.read_only are sent there; see routers.ReadReplicaRouter.
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.environ.get('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICA_ALIAS = 'replica'
+else:
+    DATABASE_REPLICA_ALIAS = None
+
+DATABASE_ROUTERS = ['datacollectors_app.routers.ReadReplicaRouter']
+
+# Request instrumentation (datacollectors_app.middleware): requests
+# slower than this are logged, as are requests repeating one SELECT at
+# least DUPLICATE_QUERY_THRESHOLD times.
+
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+DUPLICATE_QUERY_THRESHOLD = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'datacollectors': {'handlers': ['console'], 'level': 'INFO'},
+    },
 }
 
 # Password validation
@@ -142,3 +189,32 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# Local memory by default; set REDIS_URL to share the response cache and
+# its data version across processes. Response caching is off on a
+# process-local backend unless DEBUG is on or RESPONSE_CACHE_ALLOW_LOCAL=1
+# (a single-process deployment).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'datacollectors',
+    }
+}
+
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+RESPONSE_CACHE_ALLOW_LOCAL = os.environ.get('RESPONSE_CACHE_ALLOW_LOCAL') == '1'
+
+# How far the /api/sync/ cursor lags behind the clock; should exceed the
+# longest write transaction and any replica lag.
+SYNC_CURSOR_MARGIN_SECONDS = int(os.environ.get('SYNC_CURSOR_MARGIN_SECONDS', 60))